@@ -235,6 +235,8 @@ REST_FRAMEWORK = {
     #   CHANGE_PASSWORD_THROTTLE_RATE  (default: 5/minute)  — me_api.py
     #   DRIVE_UPLOAD_THROTTLE_RATE     (default: 30/minute) — drive/api.py
     #   WIKI_ATTACHMENT_MAX_MB         (default: 10 MB)     — wiki/api/attachments.py
+    #   WIKI_PDF_MAX_CHARS             (default: 500000)    — wiki/api/pages.py (export PDF)
+    #   WIKI_PDF_MAX_LINES             (default: 20000)     — wiki/api/pages.py (export PDF)
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
         "rest_framework.throttling.UserRateThrottle",
@@ -82,3 +82,14 @@ def inventory_type(db):
 @pytest.fixture(autouse=True)
 def field_encryption_key(settings):
     settings.FIELD_ENCRYPTION_KEY = "S1gOn3bVq6gUO-pMx4pPLh0bwHM3jbklDPx77ZKDq_U="
+
+
+@pytest.fixture(autouse=True)
+def _clear_custom_field_definitions_cache():
+    # Il rollback tra un test e l'altro non emette signal: la cache delle
+    # definizioni custom_fields va svuotata esplicitamente.
+    from custom_fields.validation import invalidate_definition_maps
+
+    invalidate_definition_maps()
+    yield
+    invalidate_definition_maps()
@@ -0,0 +1,23 @@
+"""Parsing condiviso del payload delle azioni bulk (bulk_restore / bulk_purge).
+
+Body accettati: {"ids": [1, 2, 3]} oppure direttamente [1, 2, 3].
+"""
+from __future__ import annotations
+
+from typing import Any
+
+
+def parse_bulk_ids(payload: Any) -> list[int] | None:
+    """Ritorna la lista di ID interi, o None se il payload non è valido.
+
+    La conversione a int avviene qui, in un solo passaggio: un ID non numerico
+    viene rifiutato con 400 invece di arrivare al DB come `id__in=["abc"]`
+    (ValueError -> 500).
+    """
+    ids = payload.get("ids") if isinstance(payload, dict) else payload
+    if not isinstance(ids, list) or not ids:
+        return None
+    try:
+        return [int(i) for i in ids]
+    except (TypeError, ValueError):
+        return None
@@ -9,7 +9,8 @@ from __future__ import annotations
 
 import base64
 import hashlib
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, Optional
 
 from django.conf import settings
 
@@ -31,6 +32,16 @@ def _derive_dev_key(secret: str) -> bytes:
     return base64.urlsafe_b64encode(digest)
 
 
+@lru_cache(maxsize=8)
+def _fernet_for_key(key_b: bytes) -> Fernet:
+    """Fernet costruito una sola volta per chiave (parsing base64 + split key).
+
+    La cache è indicizzata sulla chiave, quindi resta corretta anche quando
+    FIELD_ENCRYPTION_KEY cambia a runtime (override_settings nei test).
+    """
+    return Fernet(key_b)
+
+
 def get_fernet() -> Fernet:
     key = getattr(settings, "FIELD_ENCRYPTION_KEY", None)
     if key:
@@ -38,12 +49,12 @@ def get_fernet() -> Fernet:
             key_b = key.encode("utf-8")
         else:
             key_b = key
-        return Fernet(key_b)
+        return _fernet_for_key(key_b)
 
     # No key configured
     if getattr(settings, "DEBUG", False):
         # Dev-only fallback: derive from SECRET_KEY so local dev works
-        return Fernet(_derive_dev_key(settings.SECRET_KEY))
+        return _fernet_for_key(_derive_dev_key(settings.SECRET_KEY))
 
     raise RuntimeError(
         "FIELD_ENCRYPTION_KEY is required when DEBUG=False to encrypt/decrypt secrets."
@@ -79,3 +90,23 @@ def decrypt(value: Optional[str]) -> Optional[str]:
     except InvalidToken:
         # Wrong key or corrupted token: fail loudly (better than silent garbage)
         raise
+
+
+def decrypt_many(values: Iterable[Optional[str]]) -> list[Optional[str]]:
+    """Decifra una sequenza di valori riusando un unico Fernet.
+
+    Stessa semantica di `decrypt` per ogni elemento (vuoti e plaintext legacy
+    passano invariati); usato per il rendering many=True dei secrets.
+    """
+    values = list(values)
+    if not any(is_encrypted(v) for v in values):
+        return values
+    f = get_fernet()
+    out: list[Optional[str]] = []
+    for value in values:
+        if not is_encrypted(value):
+            out.append(value)
+            continue
+        token = value[len(PREFIX) :]
+        out.append(f.decrypt(token.encode("utf-8")).decode("utf-8"))
+    return out
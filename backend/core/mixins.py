@@ -22,12 +22,14 @@ CustomFieldsValidationMixin
 """
 from __future__ import annotations
 
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from audit.utils import log_event, to_change_value_for_field, to_primitive
+from core.bulk import parse_bulk_ids
 from core.permissions import CanRestoreModelPermission, CanPurgeModelPermission
 
 
@@ -35,6 +37,10 @@ from core.permissions import CanRestoreModelPermission, CanPurgeModelPermission
 # ViewSet mixin — soft delete + audit
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Tipi già primitivi: il confronto diretto equivale a quello via to_primitive().
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
 class SoftDeleteAuditMixin:
     """Mixin per ViewSet con soft-delete e audit logging."""
 
@@ -43,7 +49,11 @@ class SoftDeleteAuditMixin:
         for k, v in (validated or {}).items():
             before_raw = getattr(instance, k, None)
             after_raw = v
-            if to_primitive(before_raw) != to_primitive(after_raw):
+            if isinstance(before_raw, _SCALAR_TYPES) and isinstance(after_raw, _SCALAR_TYPES):
+                equal = before_raw == after_raw
+            else:
+                equal = to_primitive(before_raw) == to_primitive(after_raw)
+            if not equal:
                 changes[k] = {
                     "from": to_change_value_for_field(k, before_raw),
                     "to":   to_change_value_for_field(k, after_raw),
@@ -52,12 +62,16 @@ class SoftDeleteAuditMixin:
 
     def perform_destroy(self, instance):
         before = getattr(instance, "deleted_at", None)
-        instance.deleted_at = timezone.now()
+        now = timezone.now()
+        # UPDATE diretto sulla riga: evita il giro save() (signals, descriptor)
+        # dato che l'istanza è già stata caricata da get_object().
+        update_kwargs: dict = {"deleted_at": now, "updated_at": now}
         if hasattr(instance, "updated_by_id") or hasattr(instance, "updated_by"):
-            instance.updated_by = self.request.user
-            instance.save(update_fields=["deleted_at", "updated_by", "updated_at"])
-        else:
-            instance.save(update_fields=["deleted_at", "updated_at"])
+            update_kwargs["updated_by"] = self.request.user
+        type(instance)._default_manager.filter(pk=instance.pk).update(**update_kwargs)
+        # Allinea l'istanza in memoria per log_event e per la risposta.
+        for field, value in update_kwargs.items():
+            setattr(instance, field, value)
         changes = {
             "deleted_at": {
                 "from": to_change_value_for_field("deleted_at", before),
@@ -182,28 +196,38 @@ class RestoreActionMixin:
     @action(detail=False, methods=["post"], permission_classes=[CanRestoreModelPermission])
     def bulk_restore(self, request):
         """Ripristina più oggetti. Body: {"ids": [1, 2, 3]} o lista diretta."""
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
 
         scoped_qs = self._get_scoped_trash_queryset()
         model = scoped_qs.model
         model_name = model.__name__
-        qs = list(scoped_qs.filter(id__in=ids))
         blocked: list = []
 
-        if self.restore_use_split:
-            from core.restore_policy import split_restorable
-            qs, blocked = split_restorable(qs)
-
-        restored_ids = [obj.id for obj in qs]
-        if restored_ids:
-            now = timezone.now()
-            update_kwargs: dict = {"deleted_at": None, "updated_at": now}
-            if self.restore_has_updated_by:
-                update_kwargs["updated_by"] = request.user
-            scoped_qs.filter(id__in=restored_ids).update(**update_kwargs)
+        # Lettura degli ID e UPDATE nella stessa transazione: il set ritornato
+        # coincide con quello ripristinato.
+        with transaction.atomic():
+            if self.restore_use_split:
+                from core.restore_policy import split_restorable
+                qs, blocked = split_restorable(list(scoped_qs.filter(id__in=ids)))
+                restored_ids = [obj.id for obj in qs]
+            else:
+                # Senza policy di dipendenza servono solo gli ID: niente
+                # materializzazione delle righe complete (es. content_markdown).
+                restored_ids = list(scoped_qs.filter(id__in=ids).values_list("id", flat=True))
+            if restored_ids:
+                now = timezone.now()
+                update_kwargs: dict = {"deleted_at": None, "updated_at": now}
+                if self.restore_has_updated_by:
+                    update_kwargs["updated_by"] = request.user
+                model._default_manager.filter(id__in=restored_ids).update(**update_kwargs)
+
+        # ID richiesti ma né ripristinati né bloccati (già attivi, inesistenti o
+        # fuori scope): ricavati dai set già in memoria, senza un SELECT in più.
+        handled = set(restored_ids)
+        handled.update(item["id"] for item in blocked)
+        skipped = list(dict.fromkeys(i for i in ids if i not in handled))
 
         log_event(
             actor=request.user,
@@ -215,7 +239,8 @@ class RestoreActionMixin:
         )
         return Response(
             {"restored": restored_ids, "count": len(restored_ids),
-             "blocked": blocked, "blocked_count": len(blocked)},
+             "blocked": blocked, "blocked_count": len(blocked),
+             "skipped": skipped},
             status=status.HTTP_200_OK,
         )
 
@@ -251,9 +276,8 @@ class PurgeActionMixin:
     @action(detail=False, methods=["post"], permission_classes=[CanPurgeModelPermission])
     def bulk_purge(self, request):
         from core.purge_policy import try_purge_instance
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
 
         scoped_qs = self._get_scoped_trash_queryset()
@@ -0,0 +1,14 @@
+"""Supporto all'header HTTP `Prefer` (RFC 7240).
+
+Con `Prefer: return=minimal` il client dichiara di non aver bisogno della
+rappresentazione della risorsa nella risposta di una scrittura: la view può
+saltare la serializzazione completa e rispondere con il solo status.
+"""
+from __future__ import annotations
+
+PREFERENCE_APPLIED_MINIMAL = {"Preference-Applied": "return=minimal"}
+
+
+def prefers_minimal_response(request) -> bool:
+    prefer = request.META.get("HTTP_PREFER") or ""
+    return any(p.strip().lower() == "return=minimal" for p in prefer.split(","))
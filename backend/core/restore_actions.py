@@ -5,6 +5,7 @@ from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from core.bulk import parse_bulk_ids
 from core.permissions import CanRestoreModelPermission
 
 
@@ -54,11 +55,7 @@ class SoftDeleteRestoreActionsMixin:
         return list(self.get_restore_update_kwargs(request, now=now).keys())
 
     def parse_bulk_restore_ids(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
-            return None
-        return ids
+        return parse_bulk_ids(request.data)
 
     def before_restore_instance(self, obj, request):
         return getattr(obj, "deleted_at", None)
@@ -16,7 +16,21 @@ from __future__ import annotations
 from typing import Any, Mapping
 
 
-TRUTHY = {"1", "true", "yes", "on"}
+TRUTHY = frozenset({"1", "true", "yes", "on"})
+
+# Trash-related actions must be able to see soft-deleted objects
+_TRASH_ACTIONS = frozenset({"restore", "bulk_restore", "purge", "bulk_purge"})
+
+
+def _is_truthy(value: Any) -> bool:
+    # Fast path: param assente/vuoto o già canonico ("1", "true", ...) ->
+    # nessuna allocazione di str()/strip()/lower(). Il confronto sul solo primo
+    # carattere non è sicuro ("off" inizia come "on").
+    if not value:
+        return False
+    if value in TRUTHY:
+        return True
+    return str(value).strip().lower() in TRUTHY
 
 
 def apply_soft_delete_filters(
@@ -39,20 +53,16 @@ def apply_soft_delete_filters(
     if query_params is None and request is not None:
         query_params = getattr(request, "query_params", None)
 
-    if include_deleted is None:
-        include_deleted = (query_params.get("include_deleted") if query_params else "") or ""
     if only_deleted is None:
-        only_deleted = (query_params.get("only_deleted") if query_params else "") or ""
-
-    include_deleted = str(include_deleted).strip().lower()
-    only_deleted = str(only_deleted).strip().lower()
+        only_deleted = query_params.get("only_deleted") if query_params else None
+    if _is_truthy(only_deleted):
+        return qs.filter(deleted_at__isnull=False)
 
-    # Trash-related actions must be able to see soft-deleted objects
-    if (action_name or "") in {"restore", "bulk_restore", "purge", "bulk_purge"}:
-        include_deleted = "1"
+    if action_name in _TRASH_ACTIONS:
+        return qs
 
-    if only_deleted in TRUTHY:
-        return qs.filter(deleted_at__isnull=False)
-    if include_deleted in TRUTHY:
+    if include_deleted is None:
+        include_deleted = query_params.get("include_deleted") if query_params else None
+    if _is_truthy(include_deleted):
         return qs
     return qs.filter(deleted_at__isnull=True)
@@ -0,0 +1,18 @@
+from core.bulk import parse_bulk_ids
+
+
+def test_parse_bulk_ids_accepts_dict_and_list_payloads():
+    assert parse_bulk_ids({"ids": [1, 2, 3]}) == [1, 2, 3]
+    assert parse_bulk_ids([4, 5]) == [4, 5]
+
+
+def test_parse_bulk_ids_coerces_numeric_strings():
+    assert parse_bulk_ids({"ids": ["7", 8]}) == [7, 8]
+
+
+def test_parse_bulk_ids_rejects_invalid_payloads():
+    assert parse_bulk_ids({}) is None
+    assert parse_bulk_ids({"ids": []}) is None
+    assert parse_bulk_ids({"ids": "1,2"}) is None
+    assert parse_bulk_ids({"ids": [1, "abc"]}) is None
+    assert parse_bulk_ids({"ids": [1, None]}) is None
@@ -1,6 +1,7 @@
+from cryptography.fernet import InvalidToken
 from django.test import TestCase, override_settings
 
-from core.crypto import decrypt, encrypt
+from core.crypto import decrypt, decrypt_many, encrypt
 
 
 @override_settings(DEBUG=True)
@@ -14,3 +15,14 @@ class CryptoRoundTripTests(TestCase):
     def test_decrypt_plaintext_passthrough(self):
         plain = "already-plain"
         self.assertEqual(decrypt(plain), plain)
+
+    def test_decrypt_many_mixed_values(self):
+        token = encrypt("s3cr3t!")
+        self.assertEqual(
+            decrypt_many([None, "", "already-plain", token, token]),
+            [None, "", "already-plain", "s3cr3t!", "s3cr3t!"],
+        )
+
+    def test_decrypt_many_invalid_token_propagates(self):
+        with self.assertRaises(InvalidToken):
+            decrypt_many([encrypt("ok"), "enc::not-a-fernet-token"])
@@ -94,3 +94,58 @@ class TestRestoreResponseContracts:
         api_client.force_authenticate(user=superuser)
         res = api_client.post('/api/inventories/bulk_restore/', {'ids': []}, format='json')
         assert res.status_code == 400
+
+
+class TestBulkRestoreSkipped:
+    def test_skipped_lists_active_and_unknown_ids_in_request_order(self, api_client, superuser):
+        from wiki.models import WikiCategory
+
+        deleted = WikiCategory.objects.create(name="Cestino", deleted_at=timezone.now())
+        active = WikiCategory.objects.create(name="Attiva")
+        unknown = 999_999_999
+        api_client.force_authenticate(user=superuser)
+
+        res = api_client.post(
+            '/api/wiki-categories/bulk_restore/',
+            {'ids': [active.id, unknown, deleted.id, active.id, unknown]},
+            format='json',
+        )
+
+        assert res.status_code == 200
+        payload = res.json()
+        assert payload['restored'] == [deleted.id]
+        assert payload['blocked'] == []
+        assert payload['skipped'] == [active.id, unknown]
+        deleted.refresh_from_db()
+        assert deleted.deleted_at is None
+
+    def test_split_path_keeps_blocked_ids_out_of_skipped(self, api_client, superuser, restore_entities):
+        _, _, blocked_inv = restore_entities
+        customer_status = CustomerStatus.objects.get(key="active")
+        site_status = SiteStatus.objects.get(key="active")
+        live_customer = Customer.objects.create(name="Live Co", status=customer_status)
+        live_site = Site.objects.create(customer=live_customer, name="Live Site", status=site_status)
+        refs = {
+            "customer": live_customer,
+            "site": live_site,
+            "status": blocked_inv.status,
+            "type": blocked_inv.type,
+        }
+        restorable = Inventory.objects.create(name="Restorable", deleted_at=timezone.now(), **refs)
+        active = Inventory.objects.create(name="Already active", **refs)
+        unknown = 999_999_999
+        api_client.force_authenticate(user=superuser)
+
+        res = api_client.post(
+            '/api/inventories/bulk_restore/',
+            {'ids': [blocked_inv.id, unknown, restorable.id, active.id, blocked_inv.id]},
+            format='json',
+        )
+
+        assert res.status_code == 200
+        payload = res.json()
+        assert payload['restored'] == [restorable.id]
+        assert [item['id'] for item in payload['blocked']] == [blocked_inv.id]
+        assert payload['skipped'] == [unknown, active.id]
+        blocked_inv.refresh_from_db()
+        assert blocked_inv.deleted_at is not None
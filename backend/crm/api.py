@@ -20,6 +20,7 @@ from inventory.models import Inventory
 from issues.models import IssueStatus
 from core.crypto import decrypt
 from audit.utils import log_event, to_change_value_for_field, to_primitive
+from core.bulk import parse_bulk_ids
 from core.soft_delete import apply_soft_delete_filters
 from core.integrity import raise_integrity_error_as_validation
 from core.permissions import CanPurgeModelPermission, CanRestoreModelPermission
@@ -550,9 +551,8 @@ class ContactViewSet(AuslBoTenantWriteMixin, AuslBoScopedMixin, PurgeActionMixin
         restored contacts that are is_primary=True (typically very few).
         """
         from django.utils import timezone as tz
-        payload = request.data
-        ids = payload.get('ids') if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({'detail': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
 
         qs = list(Contact.objects.select_related('customer', 'site').filter(id__in=ids, deleted_at__isnull=False))
@@ -76,6 +76,12 @@ class CustomFieldDefinitionViewSet(SoftDeleteRestoreActionsMixin, viewsets.Model
 
         return apply_soft_delete_filters(qs, request=self.request, action_name=getattr(self, "action", ""))
 
+    def after_bulk_restore(self, restored_ids, request):
+        # Il bulk restore usa QuerySet.update(): nessun post_save da intercettare.
+        from custom_fields.validation import invalidate_definition_maps
+
+        invalidate_definition_maps()
+
     def perform_destroy(self, instance):
         before = instance.deleted_at
         instance.deleted_at = timezone.now()
@@ -5,3 +5,12 @@ class CustomFieldsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "custom_fields"
     verbose_name = "Campi custom"
+
+    def ready(self):
+        # Invalida la cache delle definizioni (custom_fields.validation) ad ogni modifica.
+        from django.db.models.signals import post_delete, post_save
+        from custom_fields.models import CustomFieldDefinition
+        from custom_fields.signals import invalidate_definition_maps_cache
+
+        post_save.connect(invalidate_definition_maps_cache, sender=CustomFieldDefinition)
+        post_delete.connect(invalidate_definition_maps_cache, sender=CustomFieldDefinition)
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+
+def invalidate_definition_maps_cache(sender, instance=None, **kwargs):
+    """Invalida la cache delle definizioni dopo save/delete di una definizione.
+
+    Si invalidano tutte le entity: `entity` potrebbe essere stata modificata.
+    """
+    from custom_fields.validation import invalidate_definition_maps
+
+    invalidate_definition_maps()
@@ -1,9 +1,15 @@
 import pytest
 
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.test import APIClient
 
 from custom_fields.models import CustomFieldDefinition
-from custom_fields.validation import normalize_and_validate_custom_fields
+from custom_fields.validation import (
+    get_definition_maps,
+    invalidate_definition_maps,
+    normalize_and_validate_custom_fields,
+)
 
 
 pytestmark = pytest.mark.django_db
@@ -143,3 +149,53 @@ def test_cleanup_drops_empty_for_non_required_known_keys_and_returns_none_when_e
         partial=False,
     )
     assert out is None
+
+
+def _validate_customer(incoming):
+    return normalize_and_validate_custom_fields(
+        entity=CustomFieldDefinition.Entity.CUSTOMER,
+        incoming=incoming,
+        existing=None,
+        partial=False,
+    )
+
+
+def test_cache_sees_definition_created_after_priming():
+    assert _validate_customer({"some": "x"}) == {"some": "x"}
+    assert "code" not in get_definition_maps(CustomFieldDefinition.Entity.CUSTOMER).defs_by_key
+
+    _mk_def(key="code", label="Codice", required=True)
+
+    with pytest.raises(serializers.ValidationError) as exc:
+        _validate_customer({"some": "x"})
+    assert "code" in exc.value.detail["custom_fields"]
+
+
+def test_cache_sees_definition_updated_and_soft_deleted():
+    d = _mk_def(key="code", label="Codice", required=False)
+    assert _validate_customer({"some": "x"}) == {"some": "x"}
+
+    d.required = True
+    d.save()
+    with pytest.raises(serializers.ValidationError):
+        _validate_customer({"some": "x"})
+
+    d.deleted_at = timezone.now()
+    d.save(update_fields=["deleted_at", "updated_at"])
+    assert _validate_customer({"some": "x"}) == {"some": "x"}
+
+
+def test_cache_sees_definition_bulk_restored(superuser):
+    d = _mk_def(key="code", label="Codice", required=True)
+    CustomFieldDefinition.objects.filter(pk=d.pk).update(deleted_at=timezone.now())
+    # update() non emette post_save: la cache va popolata dopo la cancellazione.
+    invalidate_definition_maps()
+    assert _validate_customer({"some": "x"}) == {"some": "x"}
+
+    client = APIClient()
+    client.force_authenticate(user=superuser)
+    res = client.post("/api/custom-fields/bulk_restore/", {"ids": [d.pk]}, format="json")
+    assert res.status_code == 200
+
+    with pytest.raises(serializers.ValidationError):
+        _validate_customer({"some": "x"})
@@ -4,11 +4,20 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Any, Dict, List, Optional, Tuple
 
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework import serializers
 
 from custom_fields.models import CustomFieldDefinition
 
 
+# Le definizioni cambiano raramente ma vengono lette ad ogni create/update di
+# customer/site/inventory/piano: cache condivisa (Redis in produzione) con TTL
+# breve, invalidata esplicitamente dai signal e dal ViewSet delle definizioni.
+DEFINITION_MAPS_CACHE_TTL = 60  # secondi — sovrascrivibile via settings.CUSTOM_FIELDS_CACHE_TTL
+_DEFINITION_MAPS_CACHE_KEY = "custom_fields:defs:v1:{entity}"
+
+
 def _norm_key(s: str) -> str:
     """Normalize keys for alias matching.
 
@@ -52,7 +61,23 @@ class DefMaps:
     alias_to_key: Dict[str, str]
 
 
+def invalidate_definition_maps(entity: Optional[str] = None) -> None:
+    """Svuota la cache delle definizioni (di una entity o di tutte)."""
+    entities = [entity] if entity else [e.value for e in CustomFieldDefinition.Entity]
+    cache.delete_many([_DEFINITION_MAPS_CACHE_KEY.format(entity=e) for e in entities])
+
+
 def get_definition_maps(entity: str) -> DefMaps:
+    key = _DEFINITION_MAPS_CACHE_KEY.format(entity=entity)
+    maps = cache.get(key)
+    if maps is None:
+        maps = _load_definition_maps(entity)
+        ttl = getattr(settings, "CUSTOM_FIELDS_CACHE_TTL", DEFINITION_MAPS_CACHE_TTL)
+        cache.set(key, maps, timeout=ttl)
+    return maps
+
+
+def _load_definition_maps(entity: str) -> DefMaps:
     defs = list(
         CustomFieldDefinition.objects.filter(
             entity=entity,
@@ -150,6 +175,12 @@ def normalize_and_validate_custom_fields(
 
     maps = get_definition_maps(entity)
 
+    # Nessun custom field in input né da preservare: se non esistono definizioni
+    # obbligatorie il risultato è comunque vuoto, inutile validare.
+    if not incoming_dict and not (partial and existing_dict):
+        if not any(d.required for d in maps.defs_by_key.values()):
+            return None
+
     # First pass: canonicalize keys in the incoming payload
     normalized: Dict[str, Any] = {}
 
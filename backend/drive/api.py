@@ -23,6 +23,7 @@ from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.bulk import parse_bulk_ids
 from core.permissions import CanRestoreModelPermission, IsAuthenticatedDjangoModelPermissions
 from core.mixins import SoftDeleteAuditMixin
 from core.soft_delete import apply_soft_delete_filters
@@ -47,17 +48,18 @@ def _apply_deleted_filters(qs, request, action_name: str | None = None):
     - ?view=all|deleted
     """
 
-    include_deleted = (request.query_params.get("include_deleted") or "").lower()
-    only_deleted = (request.query_params.get("only_deleted") or "").lower()
+    # None = "leggi da query_params": include_deleted/only_deleted vengono
+    # normalizzati da apply_soft_delete_filters, senza .lower() a ogni chiamata.
+    # La action restore è già tra le trash action della logica condivisa.
+    include_deleted = only_deleted = None
 
-    view_param = (request.query_params.get("view") or "").strip().lower()
-    if view_param == "deleted":
-        only_deleted = "1"
-    elif view_param == "all":
-        include_deleted = "1"
-
-    if (action_name or "") == "restore":
-        include_deleted = "1"
+    view_param = request.query_params.get("view")
+    if view_param:
+        view_param = view_param.strip().lower()
+        if view_param == "deleted":
+            only_deleted = "1"
+        elif view_param == "all":
+            include_deleted = "1"
 
     # Delegate to shared logic for consistency
     return apply_soft_delete_filters(
@@ -298,9 +300,8 @@ class DriveFolderViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"], permission_classes=[CanRestoreModelPermission])
     def bulk_restore(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=400)
 
         scoped_qs = self.filter_queryset(self.get_queryset()).filter(deleted_at__isnull=False)
@@ -474,9 +475,8 @@ class DriveFileViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"], permission_classes=[CanRestoreModelPermission])
     def bulk_restore(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=400)
 
         scoped_qs = self.filter_queryset(self.get_queryset()).filter(deleted_at__isnull=False)
@@ -1,7 +1,10 @@
+from django.urls import reverse
 from django.utils import timezone
 from django.db import IntegrityError, transaction
 from django.db.models import Exists, F, OuterRef
+from django.db.models.manager import BaseManager
 
+import django_filters as filters
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import serializers, status, viewsets
 from rest_framework.exceptions import PermissionDenied
@@ -14,24 +17,61 @@ from inventory.models import Inventory
 from audit.utils import log_event
 from issues.models import Issue, IssueStatus
 from core.soft_delete import apply_soft_delete_filters
-from core.crypto import decrypt
+from core.crypto import decrypt, decrypt_many, is_encrypted
 from core.integrity import raise_integrity_error_as_validation
+from core.prefer import PREFERENCE_APPLIED_MINIMAL, prefers_minimal_response
 from core.permissions import CanPurgeModelPermission, CanRestoreModelPermission
 from core.mixins import SoftDeleteAuditMixin, CustomFieldsValidationMixin, RestoreActionMixin, PurgeActionMixin
 from auslbo.mixins import AuslBoScopedMixin, AuslBoTenantWriteMixin
 from auslbo.permissions import IsAuslBoUserOrInternal, CrmInventoryModelPermissions
 
 
+def _decrypt_or_none(value):
+    try:
+        return decrypt(value)
+    except Exception:
+        # In case of misconfiguration (missing key) avoid crashing the API.
+        # We prefer returning a placeholder over a 500.
+        return None
+
+
 class DecryptedSecretField(serializers.CharField):
     """Serializer field that transparently decrypts values stored encrypted in DB."""
 
     def to_representation(self, value):
+        # Fast path: valori vuoti o plaintext legacy non richiedono Fernet.
+        if not value or not is_encrypted(value):
+            return value
+        # Valori già decifrati in blocco da DecryptedSecretListSerializer.
+        batch = getattr(getattr(self.parent, "parent", None), "_decrypted_secrets", None)
+        if batch and value in batch:
+            return batch[value]
+        return _decrypt_or_none(value)
+
+
+class DecryptedSecretListSerializer(serializers.ListSerializer):
+    """ListSerializer che decifra i secrets di tutte le righe in un solo passaggio."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+        secret_fields = [
+            name for name, field in self.child.fields.items()
+            if isinstance(field, DecryptedSecretField) and not field.write_only
+        ]
+        tokens = list({
+            value
+            for obj in items
+            for value in (getattr(obj, name, None) for name in secret_fields)
+            if is_encrypted(value)
+        })
         try:
-            return decrypt(value)
+            decrypted = decrypt_many(tokens)
         except Exception:
-            # In case of misconfiguration (missing key) avoid crashing the API.
-            # We prefer returning a placeholder over a 500.
-            return None
+            # Un token corrotto non deve scartare l'intero batch: si ripiega
+            # token per token e solo quelli non decifrabili diventano None.
+            decrypted = [_decrypt_or_none(token) for token in tokens]
+        self._decrypted_secrets = dict(zip(tokens, decrypted))
+        return super().to_representation(items)
 
 
 class SecretsPermissionMixin:
@@ -54,10 +94,19 @@ class SecretsPermissionMixin:
 
     def _can_view_secrets(self) -> bool:
         request = self.context.get("request") if hasattr(self, "context") else None
+        # Il serializer viene istanziato più volte per richiesta (nested, many=True):
+        # il risultato del permission check viene memorizzato sulla request.
+        cached = getattr(request, "_inv_secrets_cache", None)
+        if cached is not None:
+            return cached
         user = getattr(request, "user", None)
         if not user or not getattr(user, "is_authenticated", False):
-            return False
-        return bool(getattr(user, "is_superuser", False) or user.has_perm("inventory.view_secrets"))
+            allowed = False
+        else:
+            allowed = bool(getattr(user, "is_superuser", False) or user.has_perm("inventory.view_secrets"))
+        if request is not None:
+            request._inv_secrets_cache = allowed
+        return allowed
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -204,6 +253,7 @@ class InventoryDetailSerializer(CustomFieldsValidationMixin, SecretsPermissionMi
             "customer": {"required": True, "allow_null": False},
             "status": {"required": True, "allow_null": False},
         }
+        list_serializer_class = DecryptedSecretListSerializer
 
     def validate(self, attrs):
         """Required fields + consistency + custom_fields validation."""
@@ -270,6 +320,24 @@ class InventoryWriteSerializer(InventoryDetailSerializer):
         }
 
 
+class InventoryFilter(filters.FilterSet):
+    """Filtri FK dichiarati staticamente sulle colonne *_id.
+
+    Con `filterset_fields` django-filter ricostruisce la FilterSet ad ogni
+    richiesta e usa ModelChoiceFilter, che valida l'id con una query sulla
+    tabella correlata: un NumberFilter sulla colonna evita entrambe le cose.
+    """
+
+    customer = filters.NumberFilter(field_name="customer_id")
+    site = filters.NumberFilter(field_name="site_id")
+    status = filters.NumberFilter(field_name="status_id")
+    type = filters.NumberFilter(field_name="type_id")
+
+    class Meta:
+        model = Inventory
+        fields = ["customer", "site", "status", "type"]
+
+
 class InventoryViewSet(AuslBoTenantWriteMixin, AuslBoScopedMixin, PurgeActionMixin, RestoreActionMixin, SoftDeleteAuditMixin, viewsets.ModelViewSet):
     serializer_class = InventoryWriteSerializer
     # Fix P0 6.6: view/add/change/delete_inventory espliciti per il portale
@@ -281,7 +349,7 @@ class InventoryViewSet(AuslBoTenantWriteMixin, AuslBoScopedMixin, PurgeActionMix
     # verifica che il site scelto appartenga allo stesso tenant.
     tenant_related_fields = ("site",)
 
-    filterset_fields = ["customer", "site", "status", "type"]
+    filterset_class = InventoryFilter
 
     search_fields = [
         "name",
@@ -329,10 +397,32 @@ class InventoryViewSet(AuslBoTenantWriteMixin, AuslBoScopedMixin, PurgeActionMix
             return InventoryDetailSerializer
         return InventoryWriteSerializer
 
+    def _create_minimal(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        location = reverse("inventory-detail", kwargs={"pk": serializer.instance.pk})
+        return Response(
+            status=status.HTTP_201_CREATED,
+            headers={"Location": location, **PREFERENCE_APPLIED_MINIMAL},
+        )
+
+    def _update_minimal(self, request, partial: bool):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(
+            status=status.HTTP_204_NO_CONTENT,
+            headers=PREFERENCE_APPLIED_MINIMAL,
+        )
+
     def create(self, request, *args, **kwargs):
         """Convert DB integrity errors into 400 ValidationError."""
         try:
             with transaction.atomic():
+                if prefers_minimal_response(request):
+                    return self._create_minimal(request)
                 return super().create(request, *args, **kwargs)
         except IntegrityError as e:
             raise_integrity_error_as_validation(
@@ -347,6 +437,8 @@ class InventoryViewSet(AuslBoTenantWriteMixin, AuslBoScopedMixin, PurgeActionMix
         """Convert DB integrity errors into 400 ValidationError."""
         try:
             with transaction.atomic():
+                if prefers_minimal_response(request):
+                    return self._update_minimal(request, partial=kwargs.get("partial", False))
                 return super().update(request, *args, **kwargs)
         except IntegrityError as e:
             raise_integrity_error_as_validation(
@@ -358,9 +450,29 @@ class InventoryViewSet(AuslBoTenantWriteMixin, AuslBoScopedMixin, PurgeActionMix
             )
 
 
+    # Azioni che non serializzano l'istanza: nessun JOIN né annotazione.
+    _lean_queryset_actions = frozenset({"destroy", "purge", "bulk_purge"})
+    # restore/bulk_restore: get_restore_block_reason() legge solo customer e site.
+    _restore_queryset_actions = frozenset({"restore", "bulk_restore"})
+
     def get_queryset(self):
+        action_name = getattr(self, "action", "")
+        if action_name in self._lean_queryset_actions:
+            return apply_soft_delete_filters(Inventory.objects.all(), request=self.request, action_name=action_name)
+        if action_name in self._restore_queryset_actions:
+            qs = Inventory.objects.select_related("customer", "site")
+            if action_name == "bulk_restore":
+                # bulk_restore legge solo id + deleted_at dei parent (split_restorable)
+                # e poi esegue un unico UPDATE: niente idratazione delle righe intere.
+                qs = qs.only(
+                    "id", "deleted_at", "hostname",
+                    "customer", "customer__deleted_at",
+                    "site", "site__deleted_at",
+                )
+            return apply_soft_delete_filters(qs, request=self.request, action_name=action_name)
+
         qs = Inventory.objects.select_related("customer", "site", "status", "type")
-        if getattr(self, "action", "") == "retrieve":
+        if action_name == "retrieve":
             from inventory.models import Monitor as _Monitor
             from django.db.models import Prefetch as _Prefetch
             qs = qs.prefetch_related(
@@ -406,7 +518,7 @@ class InventoryViewSet(AuslBoTenantWriteMixin, AuslBoScopedMixin, PurgeActionMix
             active_issue_priority=Subquery(top_priority_qs, output_field=DjCharField()),
         )
 
-        return apply_soft_delete_filters(qs, request=self.request, action_name=getattr(self, "action", ""))
+        return apply_soft_delete_filters(qs, request=self.request, action_name=action_name)
 
 
 # ─── Monitor ──────────────────────────────────────────────────────────────────
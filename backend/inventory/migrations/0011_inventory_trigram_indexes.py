@@ -0,0 +1,44 @@
+"""Indici trigram (pg_trgm) per la ricerca full-text della lista inventory.
+
+InventoryViewSet.search_fields genera `UPPER(col::text) LIKE UPPER('%term%')`
+(lookup icontains di SearchFilter): un indice btree non è utilizzabile per un
+LIKE non ancorato, quindi ogni ricerca faceva un seq scan. Gli indici GIN
+trigram sono espressionali su UPPER(col) così da combaciare con la query
+generata da Django. Un indice per colonna: SearchFilter mette i campi in OR,
+e Postgres combina gli indici singoli con un BitmapOr.
+"""
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0010_alter_inventory_options"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="inv_name_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=GinIndex(OpClass(Upper("hostname"), name="gin_trgm_ops"), name="inv_hostname_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=GinIndex(OpClass(Upper("knumber"), name="gin_trgm_ops"), name="inv_knumber_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=GinIndex(OpClass(Upper("serial_number"), name="gin_trgm_ops"), name="inv_serial_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=GinIndex(OpClass(Upper("notes"), name="gin_trgm_ops"), name="inv_notes_trgm"),
+        ),
+    ]
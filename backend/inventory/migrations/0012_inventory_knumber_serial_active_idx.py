@@ -0,0 +1,35 @@
+"""Indici parziali per i controlli di duplicato su knumber/serial_number.
+
+I vincoli UNIQUE parziali sono stati rimossi in 0008: l'unicità tra gli
+inventory attivi è ora verificata da InventoryDetailSerializer.validate() con
+`filter(deleted_at__isnull=True, knumber=...).exists()` ad ogni create/update.
+Senza indice quella probe è un seq scan; gli indici btree parziali (solo righe
+attive, NULL esclusi) la riportano a un index lookup.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0011_inventory_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["knumber"],
+                condition=models.Q(deleted_at__isnull=True, knumber__isnull=False),
+                name="inv_knumber_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                fields=["serial_number"],
+                condition=models.Q(deleted_at__isnull=True, serial_number__isnull=False),
+                name="inv_serial_active_idx",
+            ),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from core.models import TimeStampedModel, InventoryType, InventoryStatus
 from core.crypto import encrypt
 from crm.models import Customer, Site
@@ -53,6 +55,24 @@ class Inventory(TimeStampedModel):
             models.Index(fields=["customer", "deleted_at"], name="inv_customer_del_idx"),
             models.Index(fields=["site", "deleted_at"], name="inv_site_del_idx"),
             models.Index(fields=["updated_at"], name="inv_updated_at_idx"),
+            # Ricerca (SearchFilter -> UPPER(col) LIKE '%term%'): indici trigram
+            # espressionali, vedi migrazione 0011.
+            GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name="inv_name_trgm"),
+            GinIndex(OpClass(Upper("hostname"), name="gin_trgm_ops"), name="inv_hostname_trgm"),
+            GinIndex(OpClass(Upper("knumber"), name="gin_trgm_ops"), name="inv_knumber_trgm"),
+            GinIndex(OpClass(Upper("serial_number"), name="gin_trgm_ops"), name="inv_serial_trgm"),
+            GinIndex(OpClass(Upper("notes"), name="gin_trgm_ops"), name="inv_notes_trgm"),
+            # Controllo duplicati in InventoryDetailSerializer.validate() (vedi 0012).
+            models.Index(
+                fields=["knumber"],
+                condition=models.Q(deleted_at__isnull=True, knumber__isnull=False),
+                name="inv_knumber_active_idx",
+            ),
+            models.Index(
+                fields=["serial_number"],
+                condition=models.Q(deleted_at__isnull=True, serial_number__isnull=False),
+                name="inv_serial_active_idx",
+            ),
         ]
         constraints = []
 
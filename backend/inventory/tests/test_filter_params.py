@@ -0,0 +1,56 @@
+"""Filtri FK di InventoryFilter (NumberFilter sulle colonne *_id)."""
+import pytest
+
+from crm.models import Customer, Site
+from inventory.models import Inventory
+
+pytestmark = pytest.mark.django_db
+
+FILTERS = ["customer", "site", "status", "type"]
+
+
+@pytest.fixture
+def inventory(customer_status, site_status, inventory_status, inventory_type):
+    customer = Customer.objects.create(name="Filter Corp", status=customer_status)
+    site = Site.objects.create(customer=customer, name="HQ", status=site_status)
+    other = Customer.objects.create(name="Other Corp", status=customer_status)
+    other_site = Site.objects.create(customer=other, name="Branch", status=site_status)
+    Inventory.objects.create(
+        customer=other, site=other_site, name="Other Server", status=inventory_status, type=inventory_type,
+    )
+    return Inventory.objects.create(
+        customer=customer, site=site, name="Filter Server", status=inventory_status, type=inventory_type,
+    )
+
+
+@pytest.mark.parametrize("param", FILTERS)
+def test_filter_by_valid_id(api_client, superuser, inventory, param):
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.get("/api/inventories/", {param: getattr(inventory, f"{param}_id")})
+
+    assert res.status_code == 200
+    ids = [row["id"] for row in res.json()["results"]]
+    assert inventory.id in ids
+    if param in ("customer", "site"):
+        assert ids == [inventory.id]
+
+
+@pytest.mark.parametrize("param", FILTERS)
+def test_filter_by_unknown_id_returns_empty_list(api_client, superuser, inventory, param):
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.get("/api/inventories/", {param: 999_999_999})
+
+    assert res.status_code == 200
+    assert res.json()["results"] == []
+
+
+@pytest.mark.parametrize("param", FILTERS)
+def test_filter_by_non_numeric_value_returns_400(api_client, superuser, inventory, param):
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.get("/api/inventories/", {param: "abc"})
+
+    assert res.status_code == 400
+    assert param in res.json()
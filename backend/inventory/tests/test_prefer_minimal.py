@@ -0,0 +1,122 @@
+"""Contratto di `Prefer: return=minimal` su create/update inventory.
+
+- POST: 201 senza body, Location sul dettaglio, Preference-Applied.
+- PUT/PATCH: 204 senza body, Preference-Applied.
+- Senza header le risposte restano quelle standard (201/200 con body).
+- IntegrityError viene ancora convertito in 400 anche sul percorso minimal.
+"""
+import pytest
+from django.db import IntegrityError
+from django.urls import reverse
+
+from crm.models import Customer, Site
+from inventory.api import InventoryViewSet
+from inventory.models import Inventory
+
+pytestmark = pytest.mark.django_db
+
+MINIMAL = {"HTTP_PREFER": "return=minimal"}
+KNUMBER_VIOLATION = 'duplicate key value violates unique constraint "ux_inventories_knumber_active"'
+
+
+@pytest.fixture
+def refs(customer_status, site_status, inventory_status, inventory_type):
+    customer = Customer.objects.create(name="Prefer Corp", status=customer_status)
+    site = Site.objects.create(customer=customer, name="HQ", status=site_status)
+    return {"customer": customer, "site": site, "status": inventory_status, "type": inventory_type}
+
+
+@pytest.fixture
+def payload(refs):
+    return {
+        "customer": refs["customer"].id,
+        "site": refs["site"].id,
+        "name": "Prefer Server",
+        "status": refs["status"].id,
+        "type": refs["type"].id,
+    }
+
+
+@pytest.fixture
+def inventory(refs):
+    return Inventory.objects.create(
+        customer=refs["customer"],
+        site=refs["site"],
+        name="Existing Server",
+        status=refs["status"],
+        type=refs["type"],
+    )
+
+
+def test_create_minimal_returns_201_with_location_and_empty_body(api_client, superuser, payload):
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.post("/api/inventories/", payload, format="json", **MINIMAL)
+
+    assert res.status_code == 201
+    assert res.content == b""
+    assert res["Preference-Applied"] == "return=minimal"
+    created = Inventory.objects.get(name="Prefer Server")
+    assert res["Location"] == reverse("inventory-detail", kwargs={"pk": created.pk})
+    assert created.customer_id == payload["customer"]
+
+
+def test_create_without_prefer_keeps_full_body(api_client, superuser, payload):
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.post("/api/inventories/", payload, format="json")
+
+    assert res.status_code == 201
+    body = res.json()
+    assert body["name"] == "Prefer Server"
+    assert body["id"] == Inventory.objects.get(name="Prefer Server").id
+    assert not res.has_header("Preference-Applied")
+
+
+def test_patch_minimal_returns_204_and_persists(api_client, superuser, inventory):
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.patch(f"/api/inventories/{inventory.id}/", {"name": "Renamed"}, format="json", **MINIMAL)
+
+    assert res.status_code == 204
+    assert res.content == b""
+    assert res["Preference-Applied"] == "return=minimal"
+    inventory.refresh_from_db()
+    assert inventory.name == "Renamed"
+
+
+def test_patch_without_prefer_keeps_full_body(api_client, superuser, inventory):
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.patch(f"/api/inventories/{inventory.id}/", {"name": "Renamed"}, format="json")
+
+    assert res.status_code == 200
+    assert res.json()["name"] == "Renamed"
+    assert not res.has_header("Preference-Applied")
+
+
+def test_create_minimal_maps_integrity_error_to_400(api_client, superuser, payload, monkeypatch):
+    def _raise(self, serializer):
+        raise IntegrityError(KNUMBER_VIOLATION)
+
+    monkeypatch.setattr(InventoryViewSet, "perform_create", _raise)
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.post("/api/inventories/", payload, format="json", **MINIMAL)
+
+    assert res.status_code == 400
+    assert "knumber" in res.json()
+    assert not Inventory.objects.filter(name="Prefer Server").exists()
+
+
+def test_patch_minimal_maps_integrity_error_to_400(api_client, superuser, inventory, monkeypatch):
+    def _raise(self, serializer):
+        raise IntegrityError(KNUMBER_VIOLATION)
+
+    monkeypatch.setattr(InventoryViewSet, "perform_update", _raise)
+    api_client.force_authenticate(user=superuser)
+
+    res = api_client.patch(f"/api/inventories/{inventory.id}/", {"knumber": "K-1"}, format="json", **MINIMAL)
+
+    assert res.status_code == 400
+    assert "knumber" in res.json()
@@ -0,0 +1,54 @@
+"""Decifratura in blocco dei secrets nel rendering many=True.
+
+Un token corrotto su una riga diventa None solo per quel campo: le altre righe
+(e gli altri campi della stessa riga) restano decifrati.
+"""
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from crm.models import Customer, Site
+from inventory.api import InventoryDetailSerializer
+from inventory.models import Inventory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def inventories(customer_status, site_status, inventory_status, inventory_type):
+    customer = Customer.objects.create(name="Batch Corp", status=customer_status)
+    site = Site.objects.create(customer=customer, name="HQ", status=site_status)
+    refs = {"customer": customer, "site": site, "status": inventory_status, "type": inventory_type}
+    first = Inventory.objects.create(name="Srv-1", os_pwd="os-one", app_pwd="app-one", **refs)
+    second = Inventory.objects.create(name="Srv-2", os_pwd="os-two", app_pwd="app-two", **refs)
+    return first, second
+
+
+def _serialize(user, queryset):
+    request = Request(APIRequestFactory().get("/api/inventories/"))
+    request.user = user
+    return InventoryDetailSerializer(queryset, many=True, context={"request": request}).data
+
+
+def test_many_decrypts_all_rows(superuser, inventories):
+    first, second = inventories
+
+    rows = {row["id"]: row for row in _serialize(superuser, Inventory.objects.filter(pk__in=[first.pk, second.pk]))}
+
+    assert rows[first.pk]["os_pwd"] == "os-one"
+    assert rows[first.pk]["app_pwd"] == "app-one"
+    assert rows[second.pk]["os_pwd"] == "os-two"
+    assert rows[second.pk]["app_pwd"] == "app-two"
+
+
+def test_many_bad_token_falls_back_per_field(superuser, inventories):
+    first, second = inventories
+    # update() salta save(): il valore corrotto arriva in DB così com'è.
+    Inventory.objects.filter(pk=first.pk).update(os_pwd="enc::not-a-fernet-token")
+
+    rows = {row["id"]: row for row in _serialize(superuser, Inventory.objects.filter(pk__in=[first.pk, second.pk]))}
+
+    assert rows[first.pk]["os_pwd"] is None
+    assert rows[first.pk]["app_pwd"] == "app-one"
+    assert rows[second.pk]["os_pwd"] == "os-two"
+    assert rows[second.pk]["app_pwd"] == "app-two"
@@ -1,6 +1,8 @@
 """maintenance/api/events.py — MaintenanceEvent serializer + ViewSet."""
 from __future__ import annotations
 
+from django.db.models import Case, CharField, F, Value, When
+from django.db.models.functions import Concat, Trim
 from django.utils import timezone
 from rest_framework import serializers, viewsets
 from rest_framework.decorators import action
@@ -8,6 +10,8 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.bulk import parse_bulk_ids
+from core.prefer import PREFERENCE_APPLIED_MINIMAL, prefers_minimal_response
 from core.permissions import CanRestoreModelPermission, CanPurgeModelPermission
 from core.uploads import validate_upload
 from core.media import build_action_url, protected_media_response
@@ -19,7 +23,7 @@ from audit.utils import log_event
 
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from maintenance.models import MaintenanceEvent, MaintenancePlan, Tech
-from maintenance.api.helpers import compute_next_due_date
+from maintenance.api.helpers import bulk_restore_ids, compute_next_due_date
 
 
 PDF_MAX_BYTES = 20 * 1024 * 1024
@@ -56,6 +60,10 @@ class MaintenanceEventSerializer(serializers.ModelSerializer):
     tech_name  = serializers.SerializerMethodField()
 
     def get_tech_name(self, obj):
+        # Annotato da MaintenanceEventViewSet.get_queryset su list; altrove
+        # (retrieve, create/update) si legge dall'istanza Tech.
+        if hasattr(obj, "_tech_name"):
+            return obj._tech_name
         if obj.tech_id is None:
             return None
         return str(obj.tech)
@@ -76,6 +84,8 @@ class MaintenanceEventSerializer(serializers.ModelSerializer):
         )
 
     def get_site_name(self, obj):
+        if hasattr(obj, "_site_name"):
+            return obj._site_name
         return obj.inventory.site.name if obj.inventory.site_id and obj.inventory.site else None
 
     def get_pdf_url(self, obj):
@@ -120,6 +130,25 @@ class MaintenanceEventSerializer(serializers.ModelSerializer):
         ]
 
 
+# Colonne lette dal serializer in list: le tabelle in select_related (inventory,
+# piano, cliente, utente) hanno campi larghi (notes, custom_fields, segreti)
+# che la lista non mostra.
+_EVENT_LIST_ONLY_FIELDS = (
+    "id", "plan", "inventory", "performed_at", "result", "tech", "created_by",
+    "notes", "pdf_file", "created_at", "updated_at", "deleted_at",
+    "plan__title", "plan__customer", "plan__customer__code", "plan__customer__name",
+    "inventory__name", "inventory__hostname", "inventory__knumber",
+    "created_by__username",
+)
+
+# tech_name replica Tech.__str__ ("first last".strip()), NULL se il tecnico manca.
+_TECH_NAME_EXPR = Case(
+    When(tech__isnull=True, then=Value(None)),
+    default=Trim(Concat("tech__first_name", Value(" "), "tech__last_name")),
+    output_field=CharField(),
+)
+
+
 class MaintenanceEventViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
     serializer_class  = MaintenanceEventSerializer
     filter_backends   = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -147,18 +176,28 @@ class MaintenanceEventViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
                 "plan",
                 "plan__customer",
                 "inventory",
-                "inventory__site",
-                "tech",
                 "created_by",
             )
         )
+        if getattr(self, "action", None) == "list":
+            # tech/site servono solo come label: calcolate in SQL invece di
+            # idratare Tech e Site per riga. Solo su list: sulle azioni di
+            # scrittura l'annotazione resterebbe stale dopo il save.
+            qs = (
+                qs.annotate(_tech_name=_TECH_NAME_EXPR, _site_name=F("inventory__site__name"))
+                .only(*_EVENT_LIST_ONLY_FIELDS)
+            )
+        else:
+            qs = qs.select_related("inventory__site", "tech")
 
-        customer = self.request.query_params.get("customer")
+        customer = (self.request.query_params.get("customer") or "").strip()
         if customer:
-            qs = qs.filter(plan__customer_id=customer)
+            # Cast a int qui: un valore non numerico dà lista vuota invece di un errore DB.
+            # isascii(): isdigit() accetta anche cifre Unicode ("²") che int() rifiuta.
+            qs = qs.filter(plan__customer_id=int(customer)) if customer.isascii() and customer.isdigit() else qs.none()
 
         year = self.request.query_params.get("performed_at__year")
-        if year and year.isdigit() and len(year) == 4:
+        if year and year.isascii() and year.isdigit() and len(year) == 4:
             qs = qs.filter(performed_at__year=int(year))
 
         return apply_soft_delete_filters(qs, request=self.request, action_name=getattr(self, "action", ""))
@@ -203,8 +242,13 @@ class MaintenanceEventViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
                 break
 
         if next_date and next_date > plan.next_due_date:
-            plan.next_due_date = next_date
-            plan.save(update_fields=["next_due_date", "updated_at"])
+            # UPDATE condizionale: il confronto avviene nel DB, così due rapportini
+            # concorrenti sullo stesso piano non possono far arretrare la data.
+            updated = MaintenancePlan.objects.filter(
+                pk=plan.pk, next_due_date__lt=next_date,
+            ).update(next_due_date=next_date, updated_at=timezone.now())
+            if updated:
+                plan.next_due_date = next_date
 
 
     @action(detail=True, methods=["post"], url_path="upload-pdf",
@@ -289,20 +333,16 @@ class MaintenanceEventViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
         obj.deleted_at = None
         obj.save(update_fields=["deleted_at", "updated_at"])
         log_event(actor=request.user, action="restore", instance=obj, request=request)
+        if prefers_minimal_response(request):
+            return Response(status=204, headers=PREFERENCE_APPLIED_MINIMAL)
         return Response(self.get_serializer(obj).data)
 
     @action(detail=False, methods=["post"], permission_classes=[CanRestoreModelPermission])
     def bulk_restore(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=400)
-        now = timezone.now()
-        restored_ids = list(
-            MaintenanceEvent.objects.filter(id__in=ids, deleted_at__isnull=False)
-            .values_list("id", flat=True)
-        )
-        MaintenanceEvent.objects.filter(id__in=restored_ids).update(deleted_at=None, updated_at=now)
+        restored_ids = bulk_restore_ids(MaintenanceEvent, ids)
         log_event(
             actor=request.user, action="restore", instance=None,
             changes={"ids": restored_ids}, request=request,
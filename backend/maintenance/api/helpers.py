@@ -2,11 +2,13 @@
 
 compute_next_due_date: calcola next_due_date da schedule_type + parametri.
 _add_months: helper per sommare mesi rispettando i giorni di fine mese.
+bulk_restore_ids: ripristino soft-delete in blocco con un solo UPDATE.
 """
 # mypy: disable-error-code=annotation-unchecked
-import calendar
 from datetime import date, timedelta
+from functools import lru_cache
 
+from django.db import transaction
 from django.db.models import OuterRef, Subquery, Count
 from django.utils import timezone
 
@@ -32,15 +34,35 @@ from maintenance.models import (
 )
 
 
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _last_day(year: int, month: int) -> int:
+    """Ultimo giorno del mese: lookup in tabella + correzione bisestile per febbraio."""
+    leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    return _DAYS_IN_MONTH[month - 1] + leap
+
+
 def _add_months(d: date, months: int) -> date:
     """Aggiunge `months` mesi a una data, clampando al last day del mese."""
     total_months = d.month - 1 + months
     year  = d.year + total_months // 12
     month = total_months % 12 + 1
-    day   = min(d.day, calendar.monthrange(year, month)[1])
+    day   = min(d.day, _last_day(year, month))
     return date(year, month, day)
 
 
+_ONE_DAY = timedelta(days=1)
+
+# interval_unit -> fine periodo (inclusivo) partendo da `start`
+_INTERVAL_END = {
+    "days":   lambda start, n: start + timedelta(days=n - 1),
+    "weeks":  lambda start, n: start + timedelta(weeks=n) - _ONE_DAY,
+    "months": lambda start, n: _add_months(start, n) - _ONE_DAY,
+    "years":  lambda start, n: _add_months(start, n * 12) - _ONE_DAY,
+}
+
+
 def compute_next_due_date(
     schedule_type: str,
     interval_value: int | None,
@@ -48,6 +70,7 @@ def compute_next_due_date(
     fixed_month: int | None,
     fixed_day: int | None,
     reference_year: int | None = None,
+    today: date | None = None,
 ) -> date | None:
     """
     Calcola la data prevista automaticamente.
@@ -55,23 +78,32 @@ def compute_next_due_date(
     - interval: 01/01/<year> + interval - 1 giorno
       es. 6 mesi → 30/06  |  1 anno → 31/12  |  3 mesi → 31/03
     - fixed_date: fixed_day/fixed_month/<year>
+
+    `today` permette al chiamante di riusare la data già calcolata per la richiesta.
     """
-    today = date.today()
-    year  = reference_year or today.year
+    year = reference_year or (today or date.today()).year
+    return _compute_next_due_date_for_year(
+        schedule_type, interval_value, interval_unit, fixed_month, fixed_day, year,
+    )
+
 
+@lru_cache(maxsize=4096)
+def _compute_next_due_date_for_year(
+    schedule_type: str,
+    interval_value: int | None,
+    interval_unit: str | None,
+    fixed_month: int | None,
+    fixed_day: int | None,
+    year: int,
+) -> date | None:
+    # Kernel puro (nessuna dipendenza da "oggi"): memoizzabile per tupla di parametri.
     if schedule_type == "interval":
         if not interval_value or not interval_unit:
             return None
-        start = date(year, 1, 1)
-        if interval_unit == "days":
-            return start + timedelta(days=interval_value) - timedelta(days=1)
-        if interval_unit == "weeks":
-            return start + timedelta(weeks=interval_value) - timedelta(days=1)
-        if interval_unit == "months":
-            return _add_months(start, interval_value) - timedelta(days=1)
-        if interval_unit == "years":
-            return _add_months(start, interval_value * 12) - timedelta(days=1)
-        return None
+        end_of = _INTERVAL_END.get(interval_unit)
+        if end_of is None:
+            return None
+        return end_of(date(year, 1, 1), interval_value)
 
     if schedule_type == "fixed_date":
         if not fixed_month or not fixed_day:
@@ -84,3 +116,18 @@ def compute_next_due_date(
     return None
 
 
+def bulk_restore_ids(model, ids: list[int]) -> list[int]:
+    """Ripristina i record soft-deleted tra `ids` e ritorna gli ID effettivamente ripristinati.
+
+    Un SELECT degli ID + un solo UPDATE (niente save() per riga né signal),
+    nella stessa transazione così il set ritornato coincide con quello aggiornato.
+    """
+    with transaction.atomic():
+        restored_ids = list(
+            model.objects.select_for_update()
+            .filter(id__in=ids, deleted_at__isnull=False)
+            .values_list("id", flat=True)
+        )
+        if restored_ids:
+            model.objects.filter(id__in=restored_ids).update(deleted_at=None, updated_at=timezone.now())
+    return restored_ids
@@ -1,13 +1,14 @@
 """maintenance/api/notifications.py — MaintenanceNotification serializer + ViewSet."""
 from __future__ import annotations
 
-from django.utils import timezone
 from rest_framework import serializers, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.bulk import parse_bulk_ids
+from core.prefer import PREFERENCE_APPLIED_MINIMAL, prefers_minimal_response
 from core.permissions import CanRestoreModelPermission, CanPurgeModelPermission
 from core.mixins import SoftDeleteAuditMixin, CustomFieldsValidationMixin, RestoreActionMixin, PurgeActionMixin
 from core.soft_delete import apply_soft_delete_filters
@@ -15,6 +16,7 @@ from core.purge_policy import try_purge_instance
 from core.restore_policy import get_restore_block_reason, split_restorable
 from audit.utils import log_event
 
+from maintenance.api.helpers import bulk_restore_ids
 from maintenance.models import MaintenanceNotification
 
 class MaintenanceNotificationSerializer(serializers.ModelSerializer):
@@ -53,6 +55,16 @@ class MaintenanceNotificationSerializer(serializers.ModelSerializer):
         ]
 
 
+# Colonne lette dal serializer in list (piano/cliente/inventory solo per le label).
+_NOTIFICATION_LIST_ONLY_FIELDS = (
+    "id", "plan", "inventory", "due_date", "sent_at",
+    "recipient_internal", "recipient_tech", "status", "error_message",
+    "created_at", "updated_at", "deleted_at",
+    "plan__title", "plan__customer", "plan__customer__code", "plan__customer__name",
+    "inventory__hostname",
+)
+
+
 class MaintenanceNotificationViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
     serializer_class = MaintenanceNotificationSerializer
     filter_backends  = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -77,13 +89,16 @@ class MaintenanceNotificationViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet
                 "plan",
                 "plan__customer",
                 "inventory",
-                "inventory__site",
             )
         )
+        if getattr(self, "action", None) == "list":
+            qs = qs.only(*_NOTIFICATION_LIST_ONLY_FIELDS)
 
-        customer = self.request.query_params.get("customer")
+        customer = (self.request.query_params.get("customer") or "").strip()
         if customer:
-            qs = qs.filter(plan__customer_id=customer)
+            # Cast a int qui: un valore non numerico dà lista vuota invece di un errore DB.
+            # isascii(): isdigit() accetta anche cifre Unicode ("²") che int() rifiuta.
+            qs = qs.filter(plan__customer_id=int(customer)) if customer.isascii() and customer.isdigit() else qs.none()
 
         return apply_soft_delete_filters(qs, request=self.request, action_name=getattr(self, "action", ""))
 
@@ -93,20 +108,16 @@ class MaintenanceNotificationViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet
         obj.deleted_at = None
         obj.save(update_fields=["deleted_at", "updated_at"])
         log_event(actor=request.user, action="restore", instance=obj, request=request)
+        if prefers_minimal_response(request):
+            return Response(status=204, headers=PREFERENCE_APPLIED_MINIMAL)
         return Response(self.get_serializer(obj).data)
 
     @action(detail=False, methods=["post"], permission_classes=[CanRestoreModelPermission])
     def bulk_restore(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=400)
-        now = timezone.now()
-        restored_ids = list(
-            MaintenanceNotification.objects.filter(id__in=ids, deleted_at__isnull=False)
-            .values_list("id", flat=True)
-        )
-        MaintenanceNotification.objects.filter(id__in=restored_ids).update(deleted_at=None, updated_at=now)
+        restored_ids = bulk_restore_ids(MaintenanceNotification, ids)
         log_event(
             actor=request.user, action="restore", instance=None,
             changes={"ids": restored_ids}, request=request,
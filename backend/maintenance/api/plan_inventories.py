@@ -152,9 +152,11 @@ class MaintenancePlanInventoryViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSe
         )
 
         # Filtri extra non coperti da filterset_fields
-        customer = self.request.query_params.get("customer")
+        customer = (self.request.query_params.get("customer") or "").strip()
         if customer:
-            qs = qs.filter(plan__customer_id=customer)
+            # Cast a int qui: un valore non numerico dà lista vuota invece di un errore DB.
+            # isascii(): isdigit() accetta anche cifre Unicode ("²") che int() rifiuta.
+            qs = qs.filter(plan__customer_id=int(customer)) if customer.isascii() and customer.isdigit() else qs.none()
 
         site = self.request.query_params.get("site")
         if site:
@@ -2,14 +2,19 @@
 from __future__ import annotations
 
 from datetime import timedelta
+from operator import itemgetter
 
+from django.db import transaction
 from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.bulk import parse_bulk_ids
+from core.prefer import PREFERENCE_APPLIED_MINIMAL, prefers_minimal_response
 from core.permissions import CanRestoreModelPermission, CanPurgeModelPermission
 from core.mixins import SoftDeleteAuditMixin, CustomFieldsValidationMixin, RestoreActionMixin, PurgeActionMixin
 from core.soft_delete import apply_soft_delete_filters
@@ -17,12 +22,12 @@ from core.purge_policy import try_purge_instance
 from core.restore_policy import get_restore_block_reason, split_restorable
 from audit.utils import log_event
 
-from django.db.models import OuterRef, Subquery, Count, DateField
-from django.db.models.functions import TruncYear
+from django.db.models import Exists, OuterRef, Prefetch, Q, Subquery, Count, DateField
+from django.db.models.functions import Coalesce, TruncYear
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from core.models import InventoryType
 from maintenance.models import MaintenancePlan, MaintenanceEvent, Tech
-from maintenance.api.helpers import compute_next_due_date
+from maintenance.api.helpers import _add_months, compute_next_due_date
 
 class MaintenancePlanSerializer(CustomFieldsValidationMixin, serializers.ModelSerializer):
     custom_fields_entity = "maintenance_plan"
@@ -52,12 +57,11 @@ class MaintenancePlanSerializer(CustomFieldsValidationMixin, serializers.ModelSe
         return [t.label for t in obj.inventory_types.all()]
 
     def get_covered_count(self, obj):
-        # Usa il valore annotato nel queryset (se presente) per evitare N+1.
-        # Il queryset di MaintenancePlanViewSet annota covered_count su list.
+        # Usa il valore annotato nel queryset (list/retrieve) per evitare N+1.
         annotated = getattr(obj, "_covered_count", None)
         if annotated is not None:
             return annotated
-        # Fallback per retrieve/destroy (singola istanza): query diretta accettabile.
+        # Fallback per le risposte di create/update (singola istanza appena salvata).
         from inventory.models import Inventory
         from core.models import InventoryStatus
         type_ids = [t.id for t in obj.inventory_types.all()]
@@ -105,6 +109,54 @@ class MaintenancePlanSerializer(CustomFieldsValidationMixin, serializers.ModelSe
         ]
 
 
+# Il serializer usa tutte le colonne del piano: si restringe solo il JOIN su customer.
+_PLAN_LIST_ONLY_FIELDS = (
+    "id", "customer", "title", "schedule_type", "interval_unit", "interval_value",
+    "fixed_month", "fixed_day", "next_due_date", "alert_days_before", "is_active",
+    "notes", "custom_fields", "created_at", "updated_at", "deleted_at",
+    "customer__code", "customer__name",
+)
+
+
+# ?due= -> filtro su next_due_date relativo a oggi
+_DUE_FILTERS = {
+    "overdue": lambda today: Q(next_due_date__lt=today),
+    "next7":   lambda today: Q(next_due_date__range=(today, today + timedelta(days=7))),
+    "next30":  lambda today: Q(next_due_date__range=(today, today + timedelta(days=30))),
+}
+
+
+def _inventory_types_prefetch():
+    # Il serializer legge solo pk (inventory_types) e label (inventory_type_labels).
+    # Niente to_attr: PrimaryKeyRelatedField(many=True) passa da .all(), che così
+    # resta servito dalla cache del prefetch.
+    return Prefetch("inventory_types", queryset=InventoryType.objects.only("id", "label"))
+
+
+def _covered_count_subquery():
+    """Inventory attivi del cliente del piano, di uno dei suoi inventory_types.
+
+    Subquery correlata (un GROUP BY per piano): indipendente dai JOIN che
+    SearchFilter/filtri aggiungono alla query esterna, quindi niente conteggi gonfiati.
+    """
+    from inventory.models import Inventory
+
+    return (
+        Inventory.objects
+        .filter(
+            customer_id=OuterRef("customer_id"),
+            type__maintenance_plans=OuterRef("pk"),
+            deleted_at__isnull=True,
+            status__key__in=("in_use", "maintenance", "repair"),
+            status__deleted_at__isnull=True,
+        )
+        .order_by()
+        .values("customer_id")
+        .annotate(cnt=Count("id"))
+        .values("cnt")[:1]
+    )
+
+
 class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
     serializer_class = MaintenancePlanSerializer
     filter_backends  = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -118,17 +170,27 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
     ordering_fields  = ["next_due_date", "title", "updated_at", "created_at", "deleted_at"]
     ordering         = ["next_due_date", "title"]
 
+    @cached_property
+    def _today(self):
+        # La viewset è istanziata per richiesta: localdate() calcolata una volta sola.
+        return timezone.localdate()
+
     def get_queryset(self):
         qs = (
             MaintenancePlan.objects
             .select_related("customer")
-            .prefetch_related("inventory_types")
+            .prefetch_related(_inventory_types_prefetch())
         )
 
         # last_done_date: annotata solo su list per evitare query extra su retrieve/destroy.
-        # covered_count: annotata tramite Subquery per eliminare N+1 nel serializer.
+        # covered_count: Subquery correlata su list e retrieve (niente query extra
+        # nel serializer). Non sulle azioni di scrittura: cambiando inventory_types
+        # il valore annotato sarebbe stale, e il serializer ricalcola.
         action = getattr(self, "action", "list")
+        if action in ("list", "retrieve"):
+            qs = qs.annotate(_covered_count=Coalesce(Subquery(_covered_count_subquery()), 0))
         if action == "list":
+            qs = qs.only(*_PLAN_LIST_ONLY_FIELDS)
             last_event_sq = (
                 MaintenanceEvent.objects
                 .filter(plan=OuterRef("pk"), deleted_at__isnull=True)
@@ -163,75 +225,19 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
         # Filtro per tipo inventario (multi: ?inventory_type=1&inventory_type=2)
         inv_types = self.request.query_params.getlist("inventory_type")
         if inv_types:
-            qs = qs.filter(inventory_types__id__in=inv_types).distinct()
+            # EXISTS sul through M2M invece di JOIN + DISTINCT sull'intera riga.
+            through = MaintenancePlan.inventory_types.through
+            qs = qs.filter(Exists(
+                through.objects.filter(maintenanceplan_id=OuterRef("pk"), inventorytype_id__in=inv_types)
+            ))
 
         # Filtro scadenza
-        due   = (self.request.query_params.get("due") or "").strip().lower()
-        today = timezone.localdate()
-        if due == "overdue":
-            qs = qs.filter(next_due_date__lt=today)
-        elif due == "next7":
-            qs = qs.filter(next_due_date__gte=today, next_due_date__lte=today + timedelta(days=7))
-        elif due == "next30":
-            qs = qs.filter(next_due_date__gte=today, next_due_date__lte=today + timedelta(days=30))
+        due_filter = _DUE_FILTERS.get((self.request.query_params.get("due") or "").strip().lower())
+        if due_filter is not None:
+            qs = qs.filter(due_filter(self._today))
 
         return apply_soft_delete_filters(qs, request=self.request, action_name=getattr(self, "action", ""))
 
-    def _compute_covered_count_map(self, plans: list[MaintenancePlan]) -> dict[int, int]:
-        if not plans:
-            return {}
-        from inventory.models import Inventory
-        from core.models import InventoryStatus
-
-        customer_ids = {plan.customer_id for plan in plans}
-        type_ids = {inv_type.id for plan in plans for inv_type in plan.inventory_types.all()}
-        if not customer_ids or not type_ids:
-            return {plan.id: 0 for plan in plans}
-
-        active_status_ids = list(
-            InventoryStatus.objects.filter(
-                key__in=("in_use", "maintenance", "repair"),
-                deleted_at__isnull=True,
-            ).values_list("id", flat=True)
-        )
-        inventory_counts = {
-            (row["customer_id"], row["type_id"]): row["cnt"]
-            for row in (
-                Inventory.objects.filter(
-                    customer_id__in=customer_ids,
-                    type_id__in=type_ids,
-                    status_id__in=active_status_ids,
-                    deleted_at__isnull=True,
-                )
-                .values("customer_id", "type_id")
-                .annotate(cnt=Count("id"))
-            )
-        }
-
-        return {
-            plan.id: sum(inventory_counts.get((plan.customer_id, inv_type.id), 0) for inv_type in plan.inventory_types.all())
-            for plan in plans
-        }
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.filter_queryset(self.get_queryset())
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            plans = list(page)
-            covered_count_map = self._compute_covered_count_map(plans)
-            for plan in plans:
-                plan._covered_count = covered_count_map.get(plan.id, 0)
-            serializer = self.get_serializer(plans, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        plans = list(queryset)
-        covered_count_map = self._compute_covered_count_map(plans)
-        for plan in plans:
-            plan._covered_count = covered_count_map.get(plan.id, 0)
-        serializer = self.get_serializer(plans, many=True)
-        return Response(serializer.data)
-
     # MaintenancePlan non ha created_by/updated_by sul modello: override senza userstamp.
     def perform_create(self, serializer):
         instance = serializer.save()
@@ -250,23 +256,28 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
         obj.deleted_at = None
         obj.save(update_fields=["deleted_at", "updated_at"])
         log_event(actor=request.user, action="restore", instance=obj, request=request)
+        if prefers_minimal_response(request):
+            return Response(status=204, headers=PREFERENCE_APPLIED_MINIMAL)
         return Response(self.get_serializer(obj).data)
 
     @action(detail=False, methods=["post"], permission_classes=[CanRestoreModelPermission])
     def bulk_restore(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=400)
-        qs = list(
-            MaintenancePlan.objects.select_related("customer")
-            .filter(id__in=ids, deleted_at__isnull=False)
-        )
-        restorable, blocked = split_restorable(qs)
-        restored_ids = [obj.id for obj in restorable]
-        if restored_ids:
-            now = timezone.now()
-            MaintenancePlan.objects.filter(id__in=restored_ids).update(deleted_at=None, updated_at=now)
+        # Cattura degli ID restorable e UPDATE nella stessa transazione: le righe
+        # vengono bloccate così un purge/restore concorrente non altera il set.
+        with transaction.atomic():
+            qs = list(
+                MaintenancePlan.objects.select_related("customer")
+                .select_for_update(of=("self",))
+                .filter(id__in=ids, deleted_at__isnull=False)
+            )
+            restorable, blocked = split_restorable(qs)
+            restored_ids = [obj.id for obj in restorable]
+            if restored_ids:
+                now = timezone.now()
+                MaintenancePlan.objects.filter(id__in=restored_ids).update(deleted_at=None, updated_at=now)
         log_event(
             actor=request.user, action="restore", instance=None,
             changes={"ids": restored_ids}, request=request,
@@ -287,9 +298,8 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"], permission_classes=[CanPurgeModelPermission])
     def bulk_purge(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=400)
         purged = []
         blocked = []
@@ -317,15 +327,15 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
         fixed_day      = request.query_params.get("fixed_day")
         year           = request.query_params.get("year")
 
-        try:
-            iv = int(interval_value) if interval_value else None
-            fm = int(fixed_month)    if fixed_month    else None
-            fd = int(fixed_day)      if fixed_day      else None
-            yr = int(year)           if year           else None
-        except (ValueError, TypeError):
+        # Validazione esplicita (interi non negativi ASCII) invece di try/except:
+        # i parametri vuoti, caso comune durante la compilazione del form, non
+        # passano da int() né dal setup delle eccezioni.
+        raw = (interval_value, fixed_month, fixed_day, year)
+        if any(v and not (v.isascii() and v.isdigit()) for v in raw):
             return Response({"detail": "Parametri non validi."}, status=400)
+        iv, fm, fd, yr = (int(v) if v else None for v in raw)
 
-        result = compute_next_due_date(schedule_type, iv, interval_unit, fm, fd, yr)
+        result = compute_next_due_date(schedule_type, iv, interval_unit, fm, fd, yr, today=self._today)
         if result is None:
             return Response({"detail": "Impossibile calcolare la data con i parametri forniti."}, status=400)
 
@@ -348,7 +358,7 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
             MaintenancePlan.objects
             .filter(deleted_at__isnull=True, is_active=True, next_due_date__isnull=False)
             .select_related("customer")
-            .prefetch_related("inventory_types")
+            .prefetch_related(_inventory_types_prefetch())
         )
         customer_param = request.query_params.get("customer")
         site_param     = request.query_params.get("site")
@@ -366,11 +376,9 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
         # Raccoglie customer_id → lista di (plan, frozenset(type_ids))
         # per filtrare gli inventory con una sola query
         customer_ids = {p.customer_id for p in plans_list}
-        all_type_ids = {
-            t_id
-            for p in plans_list
-            for t_id in p.inventory_types.values_list("id", flat=True)
-        }
+        # inventory_types.all() riusa il prefetch (values_list lo scavalcherebbe)
+        type_ids_by_plan = {p.id: {t.id for t in p.inventory_types.all()} for p in plans_list}
+        all_type_ids = set().union(*type_ids_by_plan.values())
 
         from core.models import InventoryStatus as _InvStatus
         active_status_ids = list(
@@ -387,15 +395,23 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
                 status_id__in=active_status_ids,
                 deleted_at__isnull=True,
             )
-            .select_related("site", "type", "customer")
+            # customer arriva dal piano (già in select_related): qui non serve il JOIN.
+            # only(): le righe todo leggono poche colonne, inventory ha campi larghi.
+            .select_related("site", "type")
+            .only(
+                "id", "name", "customer_id", "knumber", "hostname",
+                "site", "site__name", "site__display_name",
+                "type", "type__label",
+            )
         )
         if site_param:
             inv_qs = inv_qs.filter(site_id=site_param)
 
-        # Indice: (customer_id, type_id) → lista di inventory
+        # Indice: (customer_id, type_id) → lista di inventory.
+        # iterator(): le righe vanno solo nell'indice, niente _result_cache duplicata.
         from collections import defaultdict
         inv_index: dict = defaultdict(list)
-        for inv in inv_qs:
+        for inv in inv_qs.iterator(chunk_size=2000):
             inv_index[(inv.customer_id, inv.type_id)].append(inv)
 
         # Pivot index: (plan_id, inventory_id) → MaintenancePlanInventory
@@ -413,16 +429,19 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
 
         rows = []
         for plan in plans_list:
-            type_ids = set(plan.inventory_types.values_list("id", flat=True))
+            type_ids = type_ids_by_plan[plan.id]
+            # Serializzata una volta per piano, non per ogni inventory coperto
+            plan_due_iso = plan.next_due_date.isoformat()
             for type_id in type_ids:
                 for inv in inv_index.get((plan.customer_id, type_id), []):
                     # Usa l'override dalla pivot se esiste, altrimenti la data del piano
                     pivot = pivot_index.get((plan.id, inv.id))
-                    effective_due_date = (
-                        str(pivot.due_date_override)
+                    override_iso = (
+                        pivot.due_date_override.isoformat()
                         if pivot and pivot.due_date_override
-                        else str(plan.next_due_date)
+                        else None
                     )
+                    effective_due_date = override_iso or plan_due_iso
                     rows.append({
                         "plan_id":               plan.id,
                         "plan_title":            plan.title,
@@ -438,8 +457,8 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
                         "knumber":               inv.knumber,
                         "hostname":              inv.hostname,
                         "next_due_date":         effective_due_date,
-                        "due_date_override":     str(pivot.due_date_override) if pivot and pivot.due_date_override else None,
-                        "plan_next_due_date":    str(plan.next_due_date),
+                        "due_date_override":     override_iso,
+                        "plan_next_due_date":    plan_due_iso,
                         "plan_inventory_id":     pivot.id if pivot else None,
                         "schedule_type":         plan.schedule_type,
                         "interval_value":        plan.interval_value,
@@ -448,10 +467,36 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
                         "fixed_day":             plan.fixed_day,
                     })
 
+        # ── Due date filters ──────────────────────────────────────────────────
+        # Applicati prima dell'esclusione dei completati: i filtri sono per riga e
+        # riducono il set di piani su cui interrogare i rapportini.
+        due_before = request.query_params.get("due_before")
+        due_from   = request.query_params.get("due_from")
+        due_to     = request.query_params.get("due_to")
+        year_param = request.query_params.get("year")
+        if due_before:
+            rows = [r for r in rows if (r["next_due_date"] or "") < due_before]
+        if due_from and due_to:
+            rows = [r for r in rows if due_from <= (r["next_due_date"] or "") <= due_to]
+        if year_param and year_param.isascii() and year_param.isdigit() and len(year_param) == 4:
+            rows = [r for r in rows if (r["next_due_date"] or "").startswith(year_param)]
+
+        # ── Search ────────────────────────────────────────────────────────────
+        search = request.query_params.get("search", "").strip().lower()
+        if search:
+            rows = [
+                r for r in rows
+                if search in (r["customer_name"] or "").lower()
+                or search in (r["plan_title"] or "").lower()
+                or search in (r["inventory_name"] or "").lower()
+                or search in (r["hostname"] or "").lower()
+                or search in (r["knumber"] or "").lower()
+                or search in (r["site_name"] or "").lower()
+            ]
+
         # Escludi le coppie (plan, inventory) già completate (ok/ko) nel ciclo corrente.
         # Le righe con result='partial' rimangono visibili.
         # Il "ciclo corrente" è [subtract_cycle(next_due_date), next_due_date].
-        import calendar
         from datetime import date as date_cls
         from maintenance.models import MaintenanceEvent as MEvent
 
@@ -465,13 +510,7 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
                 if unit == "weeks":
                     return ndd - timedelta(weeks=val)
                 if unit == "months":
-                    total_months = ndd.month - (val % 12)
-                    year = ndd.year - (val // 12)
-                    if total_months <= 0:
-                        total_months += 12
-                        year -= 1
-                    day = min(ndd.day, calendar.monthrange(year, total_months)[1])
-                    return date_cls(year, total_months, day)
+                    return _add_months(ndd, -val)
                 if unit == "years":
                     try:
                         return date_cls(ndd.year - val, ndd.month, ndd.day)
@@ -490,7 +529,7 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
         recent_ok_ko = (
             MEvent.objects
             .filter(
-                plan_id__in=[r["plan_id"] for r in rows],
+                plan_id__in={r["plan_id"] for r in rows},
                 result__in=("ok", "ko", "not_planned"),
                 performed_at__gte=two_years_ago,
                 deleted_at__isnull=True,
@@ -510,38 +549,15 @@ class MaintenancePlanViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
 
         rows = [r for r in rows if (r["plan_id"], r["inventory_id"]) not in completed_pairs]
 
-        # ── Due date filters ──────────────────────────────────────────────────
-        due_before = request.query_params.get("due_before")
-        due_from   = request.query_params.get("due_from")
-        due_to     = request.query_params.get("due_to")
-        year_param = request.query_params.get("year")
-        if due_before:
-            rows = [r for r in rows if (r["next_due_date"] or "") < due_before]
-        if due_from and due_to:
-            rows = [r for r in rows if due_from <= (r["next_due_date"] or "") <= due_to]
-        if year_param and year_param.isdigit() and len(year_param) == 4:
-            rows = [r for r in rows if (r["next_due_date"] or "").startswith(year_param)]
-
-        # ── Search ────────────────────────────────────────────────────────────
-        search = request.query_params.get("search", "").strip().lower()
-        if search:
-            rows = [
-                r for r in rows
-                if search in (r["customer_name"] or "").lower()
-                or search in (r["plan_title"] or "").lower()
-                or search in (r["inventory_name"] or "").lower()
-                or search in (r["hostname"] or "").lower()
-                or search in (r["knumber"] or "").lower()
-                or search in (r["site_name"] or "").lower()
-            ]
-
         # ── Ordering ──────────────────────────────────────────────────────────
         ordering = request.query_params.get("ordering", "next_due_date")
         reverse  = ordering.startswith("-")
         field    = ordering.lstrip("-")
+        # next_due_date (ISO, dal piano o dall'override) e customer_name sono
+        # sempre valorizzati: chiavi C-level con itemgetter, senza lambda per riga.
         SORT_KEY = {
-            "next_due_date": lambda r: (r["next_due_date"] or "", r["customer_name"] or ""),
-            "customer_name": lambda r: (r["customer_name"] or "", r["next_due_date"] or ""),
+            "next_due_date": itemgetter("next_due_date", "customer_name"),
+            "customer_name": itemgetter("customer_name", "next_due_date"),
         }
         rows.sort(key=SORT_KEY.get(field, SORT_KEY["next_due_date"]), reverse=reverse)
 
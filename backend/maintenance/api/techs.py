@@ -1,13 +1,14 @@
 """maintenance/api/techs.py — Tech serializer + ViewSet."""
 from __future__ import annotations
 
-from django.utils import timezone
 from rest_framework import serializers, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 
+from core.bulk import parse_bulk_ids
+from core.prefer import PREFERENCE_APPLIED_MINIMAL, prefers_minimal_response
 from core.permissions import CanRestoreModelPermission, CanPurgeModelPermission
 from core.mixins import SoftDeleteAuditMixin, CustomFieldsValidationMixin, RestoreActionMixin, PurgeActionMixin
 from core.soft_delete import apply_soft_delete_filters
@@ -15,6 +16,7 @@ from core.purge_policy import try_purge_instance
 from core.restore_policy import get_restore_block_reason, split_restorable
 from audit.utils import log_event
 
+from maintenance.api.helpers import bulk_restore_ids
 from maintenance.models import Tech
 
 class TechSerializer(serializers.ModelSerializer):
@@ -60,20 +62,16 @@ class TechViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
         obj.deleted_at = None
         obj.save(update_fields=["deleted_at", "updated_at"])
         log_event(actor=request.user, action="restore", instance=obj, request=request)
+        if prefers_minimal_response(request):
+            return Response(status=204, headers=PREFERENCE_APPLIED_MINIMAL)
         return Response(self.get_serializer(obj).data)
 
     @action(detail=False, methods=["post"], permission_classes=[CanRestoreModelPermission])
     def bulk_restore(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=400)
-        now = timezone.now()
-        restored_ids = list(
-            Tech.objects.filter(id__in=ids, deleted_at__isnull=False)
-            .values_list("id", flat=True)
-        )
-        Tech.objects.filter(id__in=restored_ids).update(deleted_at=None, updated_at=now)
+        restored_ids = bulk_restore_ids(Tech, ids)
         log_event(
             actor=request.user, action="restore", instance=None,
             changes={"ids": restored_ids}, request=request,
@@ -97,9 +95,8 @@ class TechViewSet(SoftDeleteAuditMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"], permission_classes=[CanPurgeModelPermission])
     def bulk_purge(self, request):
-        payload = request.data
-        ids = payload.get("ids") if isinstance(payload, dict) else payload
-        if not isinstance(ids, list) or not ids:
+        ids = parse_bulk_ids(request.data)
+        if ids is None:
             return Response({"detail": "ids must be a non-empty list"}, status=400)
         purged = []
         blocked = []
@@ -0,0 +1,38 @@
+"""Indici parziali sui piani di manutenzione non soft-deleted.
+
+- mp_next_due_active_idx: i filtri ?due=overdue|next7|next30, l'ordering di
+  default (next_due_date, title) e l'action `todo` lavorano tutti su un range
+  di next_due_date tra le righe con deleted_at IS NULL.
+- mp_customer_active_idx: la lista piani filtrata per ?customer= (e la todo per
+  cliente) restringe sempre anche su deleted_at IS NULL.
+
+La condizione non include is_active: la lista non filtra per is_active, e la
+todo (che lo fa) può comunque usare l'indice applicando il filtro residuo.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maintenance", "0010_maintenanceplaninventory"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="maintenanceplan",
+            index=models.Index(
+                fields=["next_due_date"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mp_next_due_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="maintenanceplan",
+            index=models.Index(
+                fields=["customer"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mp_customer_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+"""Indici trigram (pg_trgm) per la ricerca su rapportini e piani.
+
+MaintenanceEventViewSet.search_fields e MaintenancePlanViewSet.search_fields
+generano `UPPER(col::text) LIKE UPPER('%term%')` (icontains di SearchFilter).
+Le colonne inventory (hostname, knumber, serial_number) sono già coperte da
+inventory.0011; qui si aggiungono le colonne testuali locali delle due tabelle
+di manutenzione: MaintenanceEvent.notes e MaintenancePlan.title.
+Come in inventory.0011 gli indici sono espressionali su UPPER(col) per
+combaciare con la query generata da Django.
+"""
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maintenance", "0011_maintenanceplan_active_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="maintenanceplan",
+            index=GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="mp_title_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="maintenanceevent",
+            index=GinIndex(OpClass(Upper("notes"), name="gin_trgm_ops"), name="mev_notes_trgm"),
+        ),
+    ]
@@ -0,0 +1,60 @@
+"""Indici parziali allineati all'ordering di default delle liste di manutenzione.
+
+Ogni lista filtra `deleted_at IS NULL` e ordina secondo `ordering` della
+viewset; con un indice parziale sulle stesse colonne (e nello stesso verso)
+Postgres legge le righe già ordinate e la pagina richiesta non passa da un
+nodo Sort sull'intera tabella:
+
+- Tech:                    last_name, first_name
+- MaintenancePlan:         next_due_date, title  (sostituisce mp_next_due_active_idx
+                           di 0011: il composito copre anche i range su next_due_date)
+- MaintenanceEvent:        -performed_at
+- MaintenanceNotification: -sent_at
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("maintenance", "0012_maintenance_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="maintenanceplan",
+            name="mp_next_due_active_idx",
+        ),
+        migrations.AddIndex(
+            model_name="maintenanceplan",
+            index=models.Index(
+                fields=["next_due_date", "title"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mp_live_due_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tech",
+            index=models.Index(
+                fields=["last_name", "first_name"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="tech_live_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="maintenanceevent",
+            index=models.Index(
+                fields=["-performed_at"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mev_live_performed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="maintenancenotification",
+            index=models.Index(
+                fields=["-sent_at"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mnot_live_sent_idx",
+            ),
+        ),
+    ]
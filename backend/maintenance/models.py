@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from core.models import TimeStampedModel, InventoryType
 from crm.models import Customer
 
@@ -14,6 +16,14 @@ class Tech(TimeStampedModel):
     class Meta:
         verbose_name = "Tecnico"
         verbose_name_plural = "Tecnici"
+        indexes = [
+            # Lista di default: deleted_at IS NULL ORDER BY last_name, first_name
+            models.Index(
+                fields=["last_name", "first_name"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="tech_live_name_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}".strip()
@@ -70,6 +80,22 @@ class MaintenancePlan(TimeStampedModel):
     class Meta:
         verbose_name = "Piano manutenzione"
         verbose_name_plural = "Piani manutenzioni"
+        indexes = [
+            # Filtri ?due= / ordering di default (next_due_date, title) / action todo:
+            # range e ordinamento su next_due_date tra i piani non soft-deleted.
+            models.Index(
+                fields=["next_due_date", "title"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mp_live_due_idx",
+            ),
+            models.Index(
+                fields=["customer"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mp_customer_active_idx",
+            ),
+            # Ricerca (SearchFilter -> UPPER(col) LIKE '%term%'): trigram su UPPER(col).
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="mp_title_trgm"),
+        ]
 
     def __str__(self):
         return f"{self.customer_id} - {self.title}"
@@ -79,10 +105,11 @@ class MaintenancePlan(TimeStampedModel):
     def covered_inventories(self):
         """Restituisce gli inventory attivi del customer coperti da questo piano."""
         from inventory.models import Inventory
-        type_ids = self.inventory_types.values_list("id", flat=True)
+        # JOIN sulla tabella M2M piano<->tipi (come _covered_count_subquery in
+        # api/plans.py); customer_id evita di caricare il Customer.
         return Inventory.objects.filter(
-            customer=self.customer,
-            type_id__in=type_ids,
+            customer_id=self.customer_id,
+            type__maintenance_plans=self,
             deleted_at__isnull=True,
         )
 
@@ -112,6 +139,15 @@ class MaintenanceEvent(TimeStampedModel):
     class Meta:
         verbose_name = "Rapportino"
         verbose_name_plural = "Rapportini"
+        indexes = [
+            # Lista di default: deleted_at IS NULL ORDER BY performed_at DESC
+            models.Index(
+                fields=["-performed_at"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mev_live_performed_idx",
+            ),
+            GinIndex(OpClass(Upper("notes"), name="gin_trgm_ops"), name="mev_notes_trgm"),
+        ]
 
     def __str__(self):
         return f"{self.plan_id} / {self.inventory_id} - {self.performed_at} - {self.result}"
@@ -178,6 +214,14 @@ class MaintenanceNotification(TimeStampedModel):
     class Meta:
         verbose_name = "Notifica manutenzione"
         verbose_name_plural = "Notifiche manutenzioni"
+        indexes = [
+            # Lista di default: deleted_at IS NULL ORDER BY sent_at DESC
+            models.Index(
+                fields=["-sent_at"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="mnot_live_sent_idx",
+            ),
+        ]
 
         constraints = [
             models.UniqueConstraint(
@@ -0,0 +1,113 @@
+"""?customer= su rapportini, notifiche e inventory dei piani.
+
+Un valore non numerico (o con cifre Unicode, che isdigit() accetta ma int()
+rifiuta) deve dare una lista vuota, non un errore 500.
+"""
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from core.models import CustomerStatus, SiteStatus, InventoryStatus, InventoryType
+from crm.models import Customer, Site
+from inventory.models import Inventory
+from maintenance.models import (
+    IntervalUnit,
+    MaintenanceEvent,
+    MaintenanceNotification,
+    MaintenancePlan,
+    MaintenancePlanInventory,
+    NotificationStatus,
+    ScheduleType,
+)
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINTS = [
+    "/api/maintenance-events/",
+    "/api/maintenance-notifications/",
+    "/api/maintenance-plan-inventories/",
+]
+
+
+def _superuser():
+    User = get_user_model()
+    return User.objects.create_superuser(
+        username=f"admin_{uuid.uuid4().hex[:6]}",
+        email="a@example.com",
+        password="pw",
+    )
+
+
+def _auth_client(user) -> APIClient:
+    c = APIClient()
+    c.force_authenticate(user=user)
+    return c
+
+
+@pytest.fixture
+def customer_with_rows():
+    customer_status = CustomerStatus.objects.get_or_create(key="maint_cust_t", defaults={"label": "Active"})[0]
+    site_status = SiteStatus.objects.get_or_create(key="maint_cust_t", defaults={"label": "Active"})[0]
+    inventory_status = InventoryStatus.objects.get_or_create(key="in_use", defaults={"label": "In use"})[0]
+    inventory_type = InventoryType.objects.get_or_create(key="server_cust_t", defaults={"label": "Server"})[0]
+
+    customer = Customer.objects.create(name="FilterCo", status=customer_status)
+    site = Site.objects.create(customer=customer, name="HQ", status=site_status)
+    inventory = Inventory.objects.create(
+        customer=customer,
+        site=site,
+        name="Srv-filter",
+        status=inventory_status,
+        type=inventory_type,
+    )
+    plan = MaintenancePlan.objects.create(
+        title="Piano filtro",
+        customer=customer,
+        schedule_type=ScheduleType.INTERVAL,
+        interval_unit=IntervalUnit.YEARS,
+        interval_value=1,
+        next_due_date="2027-01-01",
+    )
+    plan.inventory_types.set([inventory_type])
+
+    MaintenanceEvent.objects.create(plan=plan, inventory=inventory, performed_at="2026-02-20", result="ok")
+    MaintenanceNotification.objects.create(
+        plan=plan,
+        inventory=inventory,
+        due_date="2027-01-01",
+        recipient_internal="int@example.com",
+        recipient_tech="tech@example.com",
+        status=NotificationStatus.SENT,
+    )
+    MaintenancePlanInventory.objects.create(plan=plan, inventory=inventory)
+    return customer
+
+
+def _rows(res):
+    payload = res.json()
+    return payload.get("results", payload)
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_customer_filter_matches_numeric_id(endpoint, customer_with_rows):
+    client = _auth_client(_superuser())
+
+    res = client.get(endpoint, {"customer": str(customer_with_rows.id)})
+
+    assert res.status_code == 200
+    assert len(_rows(res)) == 1
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+@pytest.mark.parametrize("value", ["abc", "²", "1²", "-1"])
+def test_customer_filter_invalid_value_returns_empty_list(endpoint, value, customer_with_rows):
+    client = _auth_client(_superuser())
+
+    res = client.get(endpoint, {"customer": value})
+
+    assert res.status_code == 200
+    assert _rows(res) == []
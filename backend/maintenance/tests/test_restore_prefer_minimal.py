@@ -0,0 +1,121 @@
+"""restore su tecnici, piani, rapportini e notifiche con/senza `Prefer: return=minimal`.
+
+Con l'header: 204 senza body e Preference-Applied; senza: 200 con la
+rappresentazione dell'oggetto ripristinato. In entrambi i casi la riga torna attiva.
+"""
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import CustomerStatus, SiteStatus, InventoryStatus, InventoryType
+from crm.models import Customer, Site
+from inventory.models import Inventory
+from maintenance.models import (
+    IntervalUnit,
+    MaintenanceEvent,
+    MaintenanceNotification,
+    MaintenancePlan,
+    NotificationStatus,
+    ScheduleType,
+    Tech,
+)
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINTS = {
+    "tech": "/api/techs/{id}/restore/",
+    "plan": "/api/maintenance-plans/{id}/restore/",
+    "event": "/api/maintenance-events/{id}/restore/",
+    "notification": "/api/maintenance-notifications/{id}/restore/",
+}
+
+
+def _superuser():
+    User = get_user_model()
+    return User.objects.create_superuser(
+        username=f"admin_{uuid.uuid4().hex[:6]}",
+        email="a@example.com",
+        password="pw",
+    )
+
+
+def _auth_client(user) -> APIClient:
+    c = APIClient()
+    c.force_authenticate(user=user)
+    return c
+
+
+@pytest.fixture
+def deleted_objects():
+    customer_status = CustomerStatus.objects.get_or_create(key="maint_restore_t", defaults={"label": "Active"})[0]
+    site_status = SiteStatus.objects.get_or_create(key="maint_restore_t", defaults={"label": "Active"})[0]
+    inventory_status = InventoryStatus.objects.get_or_create(key="in_use", defaults={"label": "In use"})[0]
+    inventory_type = InventoryType.objects.get_or_create(key="server_restore_t", defaults={"label": "Server"})[0]
+
+    customer = Customer.objects.create(name="RestoreCo", status=customer_status)
+    site = Site.objects.create(customer=customer, name="HQ", status=site_status)
+    inventory = Inventory.objects.create(
+        customer=customer,
+        site=site,
+        name="Srv-restore",
+        status=inventory_status,
+        type=inventory_type,
+    )
+    plan = MaintenancePlan.objects.create(
+        title="Piano restore",
+        customer=customer,
+        schedule_type=ScheduleType.INTERVAL,
+        interval_unit=IntervalUnit.YEARS,
+        interval_value=1,
+        next_due_date="2027-01-01",
+    )
+    tech = Tech.objects.create(first_name="Mario", last_name="Rossi", email="mario@example.com")
+    event = MaintenanceEvent.objects.create(plan=plan, inventory=inventory, performed_at="2026-02-20", result="ok")
+    notification = MaintenanceNotification.objects.create(
+        plan=plan,
+        inventory=inventory,
+        due_date="2027-01-01",
+        recipient_internal="int@example.com",
+        recipient_tech="tech@example.com",
+        status=NotificationStatus.SENT,
+    )
+
+    # I figli prima del piano: la cancellazione del piano non deve dipendere da loro.
+    now = timezone.now()
+    objs = {"tech": tech, "event": event, "notification": notification, "plan": plan}
+    for obj in objs.values():
+        type(obj).objects.filter(pk=obj.pk).update(deleted_at=now)
+    return objs
+
+
+@pytest.mark.parametrize("kind", sorted(ENDPOINTS))
+def test_restore_with_prefer_minimal_returns_204(kind, deleted_objects):
+    obj = deleted_objects[kind]
+    client = _auth_client(_superuser())
+
+    res = client.post(ENDPOINTS[kind].format(id=obj.id), HTTP_PREFER="return=minimal")
+
+    assert res.status_code == 204
+    assert res.content == b""
+    assert res["Preference-Applied"] == "return=minimal"
+    obj.refresh_from_db()
+    assert obj.deleted_at is None
+
+
+@pytest.mark.parametrize("kind", sorted(ENDPOINTS))
+def test_restore_without_prefer_returns_payload(kind, deleted_objects):
+    obj = deleted_objects[kind]
+    client = _auth_client(_superuser())
+
+    res = client.post(ENDPOINTS[kind].format(id=obj.id))
+
+    assert res.status_code == 200
+    assert res.json()["id"] == obj.id
+    assert not res.has_header("Preference-Applied")
+    obj.refresh_from_db()
+    assert obj.deleted_at is None
@@ -11,18 +11,21 @@ class WikiCategoryAdmin(ImportExportModelAdmin):
 @admin.register(WikiPage)
 class WikiPageAdmin(ImportExportModelAdmin):
     list_display = ("id", "title", "slug", "category", "is_published", "pdf_template_key", "deleted_at", "updated_at")
+    list_select_related = ("category",)
     search_fields = ("title", "slug", "summary", "content_markdown")
     list_filter = ("is_published", "category", "deleted_at")
 
 @admin.register(WikiAttachment)
 class WikiAttachmentAdmin(ImportExportModelAdmin):
     list_display = ("id", "page", "filename", "mime_type", "size_bytes", "deleted_at", "updated_at")
+    list_select_related = ("page",)
     search_fields = ("filename", "storage_key")
     list_filter = ("mime_type", "deleted_at")
 
 @admin.register(WikiLink)
 class WikiLinkAdmin(ImportExportModelAdmin):
     list_display = ("id", "page", "entity_type", "entity_id", "deleted_at", "updated_at")
+    list_select_related = ("page",)
     search_fields = ("entity_type", "entity_id")
     list_filter = ("entity_type", "deleted_at")
 
@@ -36,6 +39,7 @@ class WikiQueryLanguageAdmin(ImportExportModelAdmin):
 @admin.register(WikiQuery)
 class WikiQueryAdmin(ImportExportModelAdmin):
     list_display = ("id", "title", "language", "use_count", "created_by", "updated_at", "deleted_at")
+    list_select_related = ("language", "created_by")
     search_fields = ("title", "description", "body", "tags")
     list_filter = ("language", "deleted_at")
     readonly_fields = ("use_count", "created_by", "updated_by", "created_at", "updated_at")
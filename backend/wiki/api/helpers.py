@@ -1,6 +1,7 @@
 """wiki/api/helpers.py — funzioni condivise tra i moduli wiki.
 
-Contiene: _sanitize_html, _is_html, _markdown_to_html, _markdown_to_plain_text,
+Contiene: _sanitize_html, _is_html, _markdown_to_html, _markdown_digest,
+_markdown_to_html_cached, _render_etag, _etag_matches, _markdown_to_plain_text,
 _attachment_accel_response, _label_for_wiki_link, _path_for_wiki_link,
 _slug_is_available, _suggest_available_slug.
 """
@@ -9,6 +10,7 @@ from __future__ import annotations
 
 import io
 import re
+import hashlib
 import logging
 import mimetypes
 from pathlib import PurePosixPath
@@ -16,9 +18,11 @@ from html import escape, unescape
 from typing import ClassVar
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models as django_models
 from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.http import parse_etags
 
 from rest_framework import serializers, viewsets
 from rest_framework.decorators import action
@@ -35,74 +39,101 @@ from core.soft_delete import apply_soft_delete_filters
 from audit.utils import log_event, to_change_value_for_field
 from wiki.models import WikiCategory, WikiPage, WikiAttachment, WikiLink, WikiPageRevision, WikiPageRating, WikiQuery, WikiQueryLanguage
 
+try:
+    import nh3 as _nh3
+    _NH3_AVAILABLE = True
+except ImportError:
+    _NH3_AVAILABLE = False
+
+try:
+    import cmarkgfm as _cmarkgfm
+    from cmarkgfm.cmark import Options as _CmarkOptions
+    _CMARKGFM_AVAILABLE = True
+except ImportError:
+    _CMARKGFM_AVAILABLE = False
+
 
 logger = logging.getLogger(__name__)
 
 
+# Whitelist per la sanitizzazione (nh3 accetta anche frozenset; evita mutazioni accidentali).
+_ALLOWED_TAGS = frozenset({
+    "a",
+    "p",
+    "br",
+    "strong",
+    "em",
+    "ul",
+    "ol",
+    "li",
+    "pre",
+    "code",
+    "blockquote",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "table",
+    "thead",
+    "tbody",
+    "tr",
+    "th",
+    "td",
+    "img",
+})
+
+# rel/target su <a> sono imposti da nh3 (link_rel / set_tag_attribute_values),
+# quindi non vanno nella whitelist degli attributi.
+_ALLOWED_ATTRS = {
+    "a": frozenset({"href", "title"}),
+    "img": frozenset({"src", "alt", "title"}),
+    "code": frozenset({"class"}),
+    "pre": frozenset({"class"}),
+    "th": frozenset({"colspan", "rowspan"}),
+    "td": frozenset({"colspan", "rowspan"}),
+}
+
+_ALLOWED_URL_SCHEMES = frozenset({"http", "https", "mailto"})
+
+# Configurazione nh3 costruita una volta: niente conversione per chiamata di
+# tag/attributi in set e, con nh3.Cleaner, niente ricostruzione del Builder
+# di ammonia a ogni clean().
+_NH3_CLEAN_KWARGS = {
+    "tags": _ALLOWED_TAGS,
+    "attributes": _ALLOWED_ATTRS,
+    "url_schemes": _ALLOWED_URL_SCHEMES,
+    "link_rel": "nofollow noopener noreferrer",
+    "set_tag_attribute_values": {"a": {"target": "_blank"}},
+}
+_HTML_CLEANER = (
+    _nh3.Cleaner(**_NH3_CLEAN_KWARGS)
+    if _NH3_AVAILABLE and hasattr(_nh3, "Cleaner")
+    else None
+)
+
+# Estensioni GFM usate dal renderer markdown (equivalenti a fenced_code + tables,
+# più autolink che sostituisce il vecchio bleach.linkify).
+_CMARK_EXTENSIONS = ("table", "autolink")
+
+
 def _sanitize_html(html: str) -> str:
     """Sanitize HTML to prevent XSS.
 
     - Strips disallowed tags/attributes.
     - Adds rel/target to links.
 
-    Requires `bleach` (added to requirements).
+    Requires `nh3` (ammonia, Rust) — vedi requirements.
     """
 
-    import bleach
-
-    allowed_tags = [
-        "a",
-        "p",
-        "br",
-        "strong",
-        "em",
-        "ul",
-        "ol",
-        "li",
-        "pre",
-        "code",
-        "blockquote",
-        "h1",
-        "h2",
-        "h3",
-        "h4",
-        "h5",
-        "h6",
-        "hr",
-        "table",
-        "thead",
-        "tbody",
-        "tr",
-        "th",
-        "td",
-        "img",
-    ]
-
-    allowed_attrs = {
-        "a": ["href", "title", "rel", "target"],
-        "img": ["src", "alt", "title"],
-        "code": ["class"],
-        "pre": ["class"],
-        "th": ["colspan", "rowspan"],
-        "td": ["colspan", "rowspan"],
-    }
-
-    cleaned = bleach.clean(
-        html or "",
-        tags=allowed_tags,
-        attributes=allowed_attrs,
-        protocols=["http", "https", "mailto"],
-        strip=True,
-    )
-
-    # Linkify plain URLs and make links safer
-    cleaned = bleach.linkify(
-        cleaned,
-        callbacks=[bleach.callbacks.nofollow, bleach.callbacks.target_blank],
-        skip_tags=["pre", "code"],
-    )
-
-    return cleaned
+    if not _NH3_AVAILABLE:
+        raise ImportError("nh3 non disponibile: impossibile sanitizzare l'HTML")
+
+    if _HTML_CLEANER is not None:
+        return _HTML_CLEANER.clean(html or "")
+    return _nh3.clean(html or "", **_NH3_CLEAN_KWARGS)
 
 
 def _is_html(text: str) -> bool:
@@ -121,15 +152,15 @@ def _markdown_to_html(md: str) -> str:
             return _sanitize_html(md)
         except Exception:
             return f"<pre>{escape(md)}</pre>"
+    if not _CMARKGFM_AVAILABLE:
+        return f"<pre>{escape(md)}</pre>"
     try:
-        import markdown as mdlib  # type: ignore[import-untyped]
-
-        html = mdlib.markdown(
+        # UNSAFE lascia passare l'HTML inline come faceva python-markdown:
+        # la sanitizzazione vera è demandata a nh3 subito dopo.
+        html = _cmarkgfm.markdown_to_html_with_extensions(
             md,
-            extensions=[
-                "fenced_code",
-                "tables",
-            ],
+            options=_CmarkOptions.CMARK_OPT_UNSAFE,
+            extensions=list(_CMARK_EXTENSIONS),
         )
         try:
             return _sanitize_html(html)
@@ -139,32 +170,95 @@ def _markdown_to_html(md: str) -> str:
         return f"<pre>{escape(md)}</pre>"
 
 
-def _markdown_to_plain_text(md: str) -> str:
-    """Best-effort conversion to a readable plain text for PDF."""
+# Cache dell'HTML renderizzato: markdown + sanitizzazione sono CPU-bound e il contenuto
+# cambia raramente. La chiave è il digest del sorgente, quindi ogni modifica
+# (anche via QuerySet.update) produce una chiave nuova senza invalidazioni esplicite.
+# _RENDER_VERSION va incrementata quando cambia l'output della pipeline
+# (markdown/sanitizzazione): invalida insieme la cache server e gli ETag dei client.
+_RENDER_VERSION = "v2"
+_RENDER_CACHE_PREFIX = f"wiki:render:{_RENDER_VERSION}:"
+_RENDER_CACHE_TTL = 86400  # 24h — sovrascrivibile via settings.WIKI_RENDER_CACHE_TTL
+
+
+def _markdown_digest(md: str) -> str:
+    """Digest sha256 del sorgente: chiave di cache e base degli ETag di render."""
+    return hashlib.sha256((md or "").encode("utf-8")).hexdigest()
+
 
+def _markdown_to_html_cached(md: str, digest: str | None = None) -> tuple[str, str]:
+    """Come _markdown_to_html, ma passa dalla cache. Ritorna (html, digest del sorgente)."""
     md = md or ""
+    digest = digest or _markdown_digest(md)
+    key = _RENDER_CACHE_PREFIX + digest
+
+    html = cache.get(key)
+    if html is None:
+        html = _markdown_to_html(md)
+        ttl = getattr(settings, "WIKI_RENDER_CACHE_TTL", _RENDER_CACHE_TTL)
+        cache.set(key, html, timeout=ttl)
+    return html, digest
+
+
+def _render_etag(*parts) -> str:
+    """ETag forte per l'HTML renderizzato, prefissato dalla versione della pipeline."""
+    return '"' + "-".join(str(p) for p in (_RENDER_VERSION, *parts)) + '"'
+
+
+def _etag_matches(request, etag: str) -> bool:
+    """True se If-None-Match della richiesta combacia con `etag` (o è "*")."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    client_etags = parse_etags(header)
+    return etag in client_etags or "*" in client_etags
+
+
+# Regex di _markdown_to_plain_text, compilate una volta a import time.
+# Tutti i marcatori inline in un'unica alternanza (una sola scansione del testo
+# invece di una per marcatore); a parità di posizione vince l'alternativa più
+# lunga: fence prima del codice inline, ** / __ prima di * / _.
+_MD_INLINE_RE = re.compile(
+    r"(?P<fence>```[\s\S]*?```)"
+    r"|`(?P<code>[^`]*)`"
+    r"|\*\*(?P<bold_star>.*?)\*\*"
+    r"|__(?P<bold_us>.*?)__"
+    r"|\*(?P<ital_star>.*?)\*"
+    r"|_(?P<ital_us>.*?)_"
+    r"|\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)]+)\)"
+)
+_MD_EMPHASIS_GROUPS = ("bold_star", "bold_us", "ital_star", "ital_us")
+# I marcatori di riga richiedono ^ (MULTILINE): seconda passata dedicata.
+_MD_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+", re.MULTILINE)
+_MD_LIST_RE = re.compile(r"^\s*(?:[-*+]|\d+\.)\s+", re.MULTILINE)
+
+
+def _md_inline_repl(m: re.Match) -> str:
+    kind = m.lastgroup
+    if kind == "fence":
+        # Drop fenced code blocks entirely (keeps PDF compact)
+        return ""
+    if kind == "code":
+        return m.group("code")
+    if kind == "link_url":
+        # Links: [text](url) -> text (url); il testo può contenere enfasi
+        return f"{_MD_INLINE_RE.sub(_md_inline_repl, m.group('link_text'))} ({m.group('link_url')})"
+    # Bold/italic: il contenuto può a sua volta contenere link o altra enfasi
+    return _MD_INLINE_RE.sub(_md_inline_repl, m.group(kind))
 
-    # Drop fenced code blocks entirely (keeps PDF compact)
-    md = re.sub(r"```[\s\S]*?```", "", md)
 
-    # Inline code
-    md = re.sub(r"`([^`]*)`", r"\1", md)
+def _markdown_to_plain_text(md: str) -> str:
+    """Best-effort conversion to a readable plain text for PDF."""
 
-    # Bold/italic markers
-    md = re.sub(r"\*\*(.*?)\*\*", r"\1", md)
-    md = re.sub(r"__(.*?)__", r"\1", md)
-    md = re.sub(r"\*(.*?)\*", r"\1", md)
-    md = re.sub(r"_(.*?)_", r"\1", md)
+    md = md or ""
 
-    # Links: [text](url) -> text (url)
-    md = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", r"\1 (\2)", md)
+    # Code, bold/italic, links: una sola passata
+    md = _MD_INLINE_RE.sub(_md_inline_repl, md)
 
     # Headings: strip leading #'s
-    md = re.sub(r"^\s{0,3}#{1,6}\s+", "", md, flags=re.MULTILINE)
+    md = _MD_HEADING_RE.sub("", md)
 
-    # List markers
-    md = re.sub(r"^\s*[-*+]\s+", "• ", md, flags=re.MULTILINE)
-    md = re.sub(r"^\s*\d+\.\s+", "• ", md, flags=re.MULTILINE)
+    # List markers (puntati e numerati)
+    md = _MD_LIST_RE.sub("• ", md)
 
     return md.strip()
 
@@ -15,14 +15,38 @@ from core.soft_delete import apply_soft_delete_filters
 from audit.utils import log_event, to_change_value_for_field
 
 import io
+import os
 import re
+import textwrap
 from html import unescape
 from django.db import models as django_models
-from django.http import HttpResponse
+from django.http import FileResponse
+from django.utils.http import http_date
 from django.conf import settings
 from rest_framework.permissions import IsAuthenticated
-from wiki.models import WikiPage, WikiPageRating, WikiPageRevision
-from wiki.api.helpers import _markdown_to_html, _markdown_to_plain_text, _slug_is_available, _suggest_available_slug
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.pdfgen import canvas
+    _REPORTLAB_AVAILABLE = True
+except ImportError:
+    _REPORTLAB_AVAILABLE = False
+
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from wiki.models import WikiAttachment, WikiLink, WikiPage, WikiPageRating, WikiPageRevision
+from wiki.api.helpers import _etag_matches, _markdown_digest, _markdown_to_html_cached, _markdown_to_plain_text, _render_etag, _slug_is_available, _suggest_available_slug
+
+# Limiti dell'export PDF: il contenuto è fornito dagli utenti e senza un tetto
+# una pagina enorme tiene occupato un worker (regex + wrap + reportlab).
+_WIKI_PDF_MAX_CHARS = int(os.environ.get("WIKI_PDF_MAX_CHARS", "500000"))
+_WIKI_PDF_MAX_LINES = int(os.environ.get("WIKI_PDF_MAX_LINES", "20000"))
+_PDF_TRUNCATED_MARKER = "[... contenuto troncato]"
+
+# Regex dell'export PDF, compilate una volta a import time.
+_PDF_PARAGRAPH_SPLIT_RE = re.compile(r"\n\n+")
+_PDF_FILENAME_UNSAFE_RE = re.compile(r"[^A-Za-z0-9._-]+")
 
 class WikiPageSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
@@ -30,6 +54,7 @@ class WikiPageSerializer(serializers.ModelSerializer):
     rating_count = serializers.SerializerMethodField()
     current_user_rating = serializers.SerializerMethodField()
     attachment_count = serializers.SerializerMethodField()
+    link_count = serializers.SerializerMethodField()
     created_by_username = serializers.SerializerMethodField()
     updated_by_username = serializers.SerializerMethodField()
 
@@ -60,7 +85,13 @@ class WikiPageSerializer(serializers.ModelSerializer):
     def get_attachment_count(self, obj):
         value = getattr(obj, "attachment_count", None)
         if value is None:
-            value = obj.attachments.count()
+            value = obj.attachments.filter(deleted_at__isnull=True).count()
+        return int(value or 0)
+
+    def get_link_count(self, obj):
+        value = getattr(obj, "link_count", None)
+        if value is None:
+            value = obj.links.filter(deleted_at__isnull=True).count()
         return int(value or 0)
 
     def get_created_by_username(self, obj):
@@ -95,6 +126,7 @@ class WikiPageSerializer(serializers.ModelSerializer):
             "rating_count",
             "current_user_rating",
             "attachment_count",
+            "link_count",
             "custom_fields",
             "pdf_template_key",
             "pdf_options",
@@ -107,6 +139,49 @@ class WikiPageSerializer(serializers.ModelSerializer):
         read_only_fields = ["kb_code", "view_count"]
 
 
+# Campi pesanti (TEXT/JSONB, spesso TOASTati) che la lista non mostra:
+# vengono serviti solo da retrieve/create/update.
+_PAGE_HEAVY_FIELDS = ("content_markdown", "custom_fields", "pdf_options")
+
+_PAGE_LIST_ONLY_FIELDS = (
+    "id", "kb_code", "title", "slug", "category", "summary", "tags", "is_published",
+    "view_count", "pdf_template_key", "created_by", "updated_by", "created_at", "updated_at", "deleted_at",
+    "category__name",
+    "created_by__username", "created_by__first_name", "created_by__last_name",
+    "updated_by__username", "updated_by__first_name", "updated_by__last_name",
+)
+
+
+# Azioni che usano solo i campi propri della pagina (titolo, slug, contenuto).
+_CONTENT_ONLY_ACTIONS = frozenset({"render_page", "export_pdf"})
+
+
+class WikiPageListSerializer(WikiPageSerializer):
+    """Serializer leggero per la lista: senza contenuto, custom_fields e pdf_options."""
+
+    class Meta(WikiPageSerializer.Meta):
+        fields = [f for f in WikiPageSerializer.Meta.fields if f not in _PAGE_HEAVY_FIELDS]
+
+
+def _live_count_subquery(model):
+    """Conteggio righe non cancellate di `model` per pagina (subquery correlata).
+
+    A differenza di Count su JOIN, non moltiplica le righe della query esterna
+    (ratings x attachments x links) e non dipende dai JOIN aggiunti dai filtri.
+    """
+    return Coalesce(
+        Subquery(
+            model.objects
+            .filter(page_id=OuterRef("pk"), deleted_at__isnull=True)
+            .order_by()
+            .values("page_id")
+            .annotate(cnt=django_models.Count("id"))
+            .values("cnt")[:1]
+        ),
+        0,
+    )
+
+
 class WikiPageViewSet(RestoreActionMixin, SoftDeleteAuditMixin, viewsets.ModelViewSet):
     restore_has_updated_by  = True
     restore_response_204    = False
@@ -126,19 +201,34 @@ class WikiPageViewSet(RestoreActionMixin, SoftDeleteAuditMixin, viewsets.ModelVi
         "rating_count",
         "view_count",
         "attachment_count",
+        "link_count",
     ]
     ordering = ["title"]
 
+    def get_serializer_class(self):
+        if getattr(self, "action", "") == "list":
+            return WikiPageListSerializer
+        return WikiPageSerializer
+
     def get_queryset(self):
+        action_name = getattr(self, "action", "")
+        if action_name in _CONTENT_ONLY_ACTIONS:
+            # render/export leggono solo la riga della pagina: niente aggregati
+            # sui ratings, conteggi o prefetch del voto utente.
+            return apply_soft_delete_filters(WikiPage.objects.all(), request=self.request, action_name=action_name)
+
         qs = (
             WikiPage.objects
             .select_related("category", "created_by", "updated_by")
             .annotate(
                 average_rating=django_models.Avg("ratings__rating"),
                 rating_count=django_models.Count("ratings", distinct=True),
-                attachment_count=django_models.Count("attachments", distinct=True),
+                attachment_count=_live_count_subquery(WikiAttachment),
+                link_count=_live_count_subquery(WikiLink),
             )
         )
+        if action_name == "list":
+            qs = qs.only(*_PAGE_LIST_ONLY_FIELDS)
 
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
@@ -150,7 +240,7 @@ class WikiPageViewSet(RestoreActionMixin, SoftDeleteAuditMixin, viewsets.ModelVi
                 )
             )
 
-        return apply_soft_delete_filters(qs, request=self.request, action_name=getattr(self, "action", ""))
+        return apply_soft_delete_filters(qs, request=self.request, action_name=action_name)
 
     @action(detail=False, methods=["get"], url_path="slug-availability")
     def slug_availability(self, request):
@@ -175,8 +265,25 @@ class WikiPageViewSet(RestoreActionMixin, SoftDeleteAuditMixin, viewsets.ModelVi
         """Return rendered (sanitized) HTML for a wiki page's markdown."""
 
         page = self.get_object()
-        html = _markdown_to_html(page.content_markdown or "")
-        return Response({"id": page.id, "title": page.title, "slug": page.slug, "html": html})
+        content = page.content_markdown or ""
+        digest = _markdown_digest(content)
+
+        # L'ETag copre anche titolo/slug (via updated_at), non solo il contenuto.
+        # Il confronto avviene prima del render: un 304 non tocca né cache né markdown.
+        updated_ts = int(page.updated_at.timestamp()) if page.updated_at else 0
+        etag = _render_etag(page.id, updated_ts, digest[:16])
+        headers = {"ETag": etag}
+        if page.updated_at:
+            headers["Last-Modified"] = http_date(page.updated_at.timestamp())
+
+        if _etag_matches(request, etag):
+            return Response(status=drf_status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        html, _ = _markdown_to_html_cached(content, digest)
+        return Response(
+            {"id": page.id, "title": page.title, "slug": page.slug, "html": html},
+            headers=headers,
+        )
 
     @action(detail=True, methods=["get"], url_path="export-pdf")
     def export_pdf(self, request, pk=None):
@@ -184,12 +291,8 @@ class WikiPageViewSet(RestoreActionMixin, SoftDeleteAuditMixin, viewsets.ModelVi
 
         page = self.get_object()
 
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib.units import cm
-            from reportlab.pdfgen import canvas
-        except Exception as e:
-            return Response({"detail": f"PDF export dependency missing: {e}"}, status=501)
+        if not _REPORTLAB_AVAILABLE:
+            return Response({"detail": "PDF export dependency missing: reportlab"}, status=501)
 
         buf = io.BytesIO()
         c = canvas.Canvas(buf, pagesize=A4)
@@ -208,51 +311,79 @@ class WikiPageViewSet(RestoreActionMixin, SoftDeleteAuditMixin, viewsets.ModelVi
         y -= 24
 
         # Body text
-        c.setFont("Helvetica", 10)
-        text = _markdown_to_plain_text(page.content_markdown or "")
+        content = page.content_markdown or ""
+        truncated = len(content) > _WIKI_PDF_MAX_CHARS
+        if truncated:
+            content = content[:_WIKI_PDF_MAX_CHARS]
+        text = _markdown_to_plain_text(content)
 
         def wrap_line(line: str, max_chars: int) -> list[str]:
             if not line:
                 return [""]
-            out: list[str] = []
-            cur = ""
-            for word in line.split():
-                if len(cur) + (1 if cur else 0) + len(word) <= max_chars:
-                    cur = f"{cur} {word}".strip()
-                else:
-                    out.append(cur)
-                    cur = word
-            if cur:
-                out.append(cur)
-            return out
+            # Una sola passata, senza ricostruire la riga parola per parola;
+            # gli spazi multipli vengono normalizzati come prima.
+            return textwrap.wrap(
+                " ".join(line.split()),
+                width=max_chars,
+                break_long_words=False,
+                break_on_hyphens=False,
+            )
 
         # Very rough char-based wrap; good enough for readable PDFs
         max_chars = 110
-        lines: list[str] = []
-        for para in re.split(r"\n\n+", text):
-            para = para.strip()
-            if not para:
-                lines.append("")
-                continue
-            for ln in para.splitlines():
-                lines.extend(wrap_line(ln, max_chars))
-            lines.append("")
+
+        def iter_lines():
+            # Generatore: le righe vanno dritte al text object, senza una lista
+            # intermedia con l'intero documento.
+            for para in _PDF_PARAGRAPH_SPLIT_RE.split(text):
+                para = para.strip()
+                if not para:
+                    yield ""
+                    continue
+                for ln in para.splitlines():
+                    yield from wrap_line(ln, max_chars)
+                yield ""
 
         line_h = 13
-        for ln in lines:
-            if y <= bottom:
+
+        def new_text_block(start_y: float):
+            # Un solo blocco BT/ET per pagina con avanzamento T*, invece di
+            # un drawString (e relativo posizionamento) per ogni riga.
+            tobj = c.beginText(left, start_y)
+            tobj.setFont("Helvetica", 10)
+            tobj.setLeading(line_h)
+            return tobj
+
+        def iter_capped_lines():
+            # Tetto sulle righe disegnate; se scatta (o se il sorgente era già
+            # stato tagliato) si chiude con un marcatore visibile nel PDF.
+            nonlocal truncated
+            for n, ln in enumerate(iter_lines()):
+                if n >= _WIKI_PDF_MAX_LINES:
+                    truncated = True
+                    break
+                yield ln
+            if truncated:
+                yield _PDF_TRUNCATED_MARKER
+
+        tobj = new_text_block(y)
+        for ln in iter_capped_lines():
+            if tobj.getY() <= bottom:
+                c.drawText(tobj)
                 c.showPage()
-                c.setFont("Helvetica", 10)
-                y = height - top
-            c.drawString(left, y, ln)
-            y -= line_h
+                tobj = new_text_block(height - top)
+            tobj.textLine(ln)
+        c.drawText(tobj)
 
         c.save()
         buf.seek(0)
 
-        filename = re.sub(r"[^A-Za-z0-9._-]+", "_", page.slug or f"wiki_{page.id}") + ".pdf"
-        resp = HttpResponse(buf.getvalue(), content_type="application/pdf")
-        resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+        # FileResponse itera il BytesIO a blocchi: niente copia completa del PDF
+        # via getvalue(). Content-Disposition viene impostato da as_attachment.
+        filename = _PDF_FILENAME_UNSAFE_RE.sub("_", page.slug or f"wiki_{page.id}") + ".pdf"
+        resp = FileResponse(buf, as_attachment=True, filename=filename, content_type="application/pdf")
+        if truncated:
+            resp["X-Content-Truncated"] = "1"
         return resp
 
     def perform_create(self, serializer):
@@ -15,7 +15,7 @@ from core.soft_delete import apply_soft_delete_filters
 from audit.utils import log_event, to_change_value_for_field
 
 from wiki.models import WikiPageRevision, WikiPage
-from wiki.api.helpers import _markdown_to_html
+from wiki.api.helpers import _etag_matches, _markdown_to_html_cached, _render_etag
 
 
 class WikiPageRevisionSerializer(serializers.ModelSerializer):
@@ -65,8 +65,13 @@ class WikiPageRevisionViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=["get"], url_path="render")
     def render_revision(self, request, pk=None):
         rev = self.get_object()
-        html = _markdown_to_html(rev.content_markdown or "")
-        return Response({"id": rev.id, "title": rev.title, "html": html})
+        # Le revisioni sono snapshot immutabili: id + versione del render bastano
+        # come ETag e il 304 evita sia il render sia il trasferimento dell'HTML.
+        headers = {"ETag": _render_etag("rev", rev.id)}
+        if _etag_matches(request, headers["ETag"]):
+            return Response(status=drf_status.HTTP_304_NOT_MODIFIED, headers=headers)
+        html, _ = _markdown_to_html_cached(rev.content_markdown or "")
+        return Response({"id": rev.id, "title": rev.title, "html": html}, headers=headers)
 
     @action(detail=True, methods=["post"], url_path="restore", permission_classes=[CanRestoreModelPermission])
     def restore(self, request, pk=None):
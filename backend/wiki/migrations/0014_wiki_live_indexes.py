@@ -0,0 +1,58 @@
+"""Indici parziali (deleted_at IS NULL) allineati alle liste wiki.
+
+Ogni viewset wiki filtra le righe attive e ordina secondo il proprio
+`ordering`; gli indici coprono filtro + ordinamento così la pagina richiesta
+non passa da un seq scan seguito da un Sort:
+
+- WikiCategory:   sort_order, name
+- WikiPage:       title
+- WikiAttachment: page, filename   (?page_id= + ordering filename)
+- WikiLink:       page, -updated_at (?page_id= + ordering -updated_at);
+                  i lookup per entità restano su ix_wiki_links_entity.
+
+Niente indici sulle righe nel cestino: ?only_deleted= è una vista di
+amministrazione su poche righe e bulk_restore filtra per id__in (PK).
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wiki", "0013_alter_wikiquerylanguage_color_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="wikicategory",
+            index=models.Index(
+                fields=["sort_order", "name"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="wiki_cat_live_order_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wikipage",
+            index=models.Index(
+                fields=["title"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="wiki_page_live_title_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wikiattachment",
+            index=models.Index(
+                fields=["page", "filename"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="wiki_att_live_page_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wikilink",
+            index=models.Index(
+                fields=["page", "-updated_at"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="wiki_link_live_page_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+"""Indici trigram (pg_trgm) per la ricerca sulle pagine wiki.
+
+WikiPageViewSet.search_fields (title, slug, summary, content_markdown)
+genera `UPPER(col) LIKE UPPER('%term%')` in OR tra le colonne: senza indice
+ogni ricerca è un seq scan sull'intera tabella, TEXT del contenuto compreso.
+Un GIN trigram per colonna permette a Postgres di combinarli in un BitmapOr.
+
+Si resta sulla stessa strategia di inventory.0011 / maintenance.0012 (indici
+espressionali su UPPER(col)) invece di passare alla full-text search: la
+semantica "sottostringa" di SearchFilter resta invariata, compresa la
+ricerca parziale per titolo/codice usata dal selettore dei link wiki.
+"""
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wiki", "0014_wiki_live_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="wikipage",
+            index=GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="wiki_page_title_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="wikipage",
+            index=GinIndex(OpClass(Upper("slug"), name="gin_trgm_ops"), name="wiki_page_slug_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="wikipage",
+            index=GinIndex(OpClass(Upper("summary"), name="gin_trgm_ops"), name="wiki_page_summary_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="wikipage",
+            index=GinIndex(
+                OpClass(Upper("content_markdown"), name="gin_trgm_ops"),
+                name="wiki_page_content_trgm",
+            ),
+        ),
+    ]
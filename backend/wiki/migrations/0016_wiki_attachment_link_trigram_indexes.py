@@ -0,0 +1,39 @@
+"""Indici trigram (pg_trgm) per la ricerca su allegati e link wiki.
+
+WikiAttachmentViewSet.search_fields (filename, storage_key, notes,
+page__title) e WikiLinkViewSet.search_fields (notes, page__title,
+entity_type) generano `UPPER(col) LIKE UPPER('%term%')`.
+page__title è già coperto da wiki.0015; qui si indicizzano le colonne
+testuali locali. entity_type resta escluso: è una choice di pochi caratteri
+con cardinalità minima, un trigram non porterebbe nulla.
+L'estensione pg_trgm è già creata da wiki.0015.
+"""
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wiki", "0015_wikipage_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="wikiattachment",
+            index=GinIndex(OpClass(Upper("filename"), name="gin_trgm_ops"), name="wiki_att_filename_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="wikiattachment",
+            index=GinIndex(OpClass(Upper("storage_key"), name="gin_trgm_ops"), name="wiki_att_storage_key_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="wikiattachment",
+            index=GinIndex(OpClass(Upper("notes"), name="gin_trgm_ops"), name="wiki_att_notes_trgm"),
+        ),
+        migrations.AddIndex(
+            model_name="wikilink",
+            index=GinIndex(OpClass(Upper("notes"), name="gin_trgm_ops"), name="wiki_link_notes_trgm"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+"""Indice per entità di WikiLink limitato alle righe attive.
+
+WikiLinkViewSet filtra per entity_type + entity_id insieme al filtro
+soft-delete (deleted_at IS NULL). ix_wiki_links_entity non includeva
+deleted_at, quindi i link cancellati restavano nell'indice e andavano
+scartati leggendo la heap. Lo si sostituisce con la versione parziale.
+
+Per il filtro ?page= non serve un indice nuovo: wiki_link_live_page_idx
+(page, -updated_at, parziale su deleted_at IS NULL) è già in wiki.0014.
+"""
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wiki", "0016_wiki_attachment_link_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="wikilink",
+            name="ix_wiki_links_entity",
+        ),
+        migrations.AddIndex(
+            model_name="wikilink",
+            index=models.Index(
+                fields=["entity_type", "entity_id"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="ix_wiki_links_entity_active",
+            ),
+        ),
+    ]
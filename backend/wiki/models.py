@@ -2,6 +2,8 @@ from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 from core.models import TimeStampedModel
 
 
@@ -15,6 +17,14 @@ class WikiCategory(TimeStampedModel):
     class Meta:
         verbose_name = "Categoria"
         verbose_name_plural = "Categorie"
+        indexes = [
+            # Lista di default: deleted_at IS NULL ORDER BY sort_order, name
+            models.Index(
+                fields=["sort_order", "name"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="wiki_cat_live_order_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["name"],
@@ -66,6 +76,20 @@ class WikiPage(TimeStampedModel):
     class Meta:
         verbose_name = "Pagina"
         verbose_name_plural = "Pagine"
+        indexes = [
+            # Lista di default: deleted_at IS NULL ORDER BY title
+            models.Index(
+                fields=["title"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="wiki_page_live_title_idx",
+            ),
+            # Ricerca (SearchFilter -> UPPER(col) LIKE '%term%'): trigram su UPPER(col)
+            # per tutti i search_fields, così l'OR tra colonne resta un BitmapOr.
+            GinIndex(OpClass(Upper("title"), name="gin_trgm_ops"), name="wiki_page_title_trgm"),
+            GinIndex(OpClass(Upper("slug"), name="gin_trgm_ops"), name="wiki_page_slug_trgm"),
+            GinIndex(OpClass(Upper("summary"), name="gin_trgm_ops"), name="wiki_page_summary_trgm"),
+            GinIndex(OpClass(Upper("content_markdown"), name="gin_trgm_ops"), name="wiki_page_content_trgm"),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["slug"],
@@ -157,6 +181,18 @@ class WikiAttachment(TimeStampedModel):
     class Meta:
         verbose_name = "Allegato"
         verbose_name_plural = "Allegati"
+        indexes = [
+            # Allegati di una pagina (?page_id=) ordinati per filename
+            models.Index(
+                fields=["page", "filename"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="wiki_att_live_page_idx",
+            ),
+            # Ricerca (SearchFilter -> UPPER(col) LIKE '%term%'): trigram su UPPER(col).
+            GinIndex(OpClass(Upper("filename"), name="gin_trgm_ops"), name="wiki_att_filename_trgm"),
+            GinIndex(OpClass(Upper("storage_key"), name="gin_trgm_ops"), name="wiki_att_storage_key_trgm"),
+            GinIndex(OpClass(Upper("notes"), name="gin_trgm_ops"), name="wiki_att_notes_trgm"),
+        ]
 
     def __str__(self):
         return self.filename
@@ -178,7 +214,19 @@ class WikiLink(TimeStampedModel):
         verbose_name = "Link"
         verbose_name_plural = "Links"
         indexes = [
-            models.Index(fields=["entity_type", "entity_id"], name="ix_wiki_links_entity"),
+            # Link di un'entità (?entity_type=&entity_id=) tra le righe attive
+            models.Index(
+                fields=["entity_type", "entity_id"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="ix_wiki_links_entity_active",
+            ),
+            # Link di una pagina (?page_id=) ordinati per -updated_at
+            models.Index(
+                fields=["page", "-updated_at"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="wiki_link_live_page_idx",
+            ),
+            GinIndex(OpClass(Upper("notes"), name="gin_trgm_ops"), name="wiki_link_notes_trgm"),
         ]
 
     def __str__(self):
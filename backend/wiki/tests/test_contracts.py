@@ -5,6 +5,7 @@ import uuid
 import pytest
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from core.models import CustomerStatus
@@ -138,3 +139,51 @@ def test_wiki_link_serializer_exposes_entity_label_and_path_for_customers():
     assert response.status_code == 200, response.data
     assert response.data["entity_label"] == "Acme Srl"
     assert response.data["entity_path"] == f"/customers?open={customer.id}"
+
+
+def test_page_counts_exclude_soft_deleted_attachments_and_links():
+    user = _make_superuser()
+    page = _make_page(user)
+    empty_page = _make_page(user)
+    client = _auth_client(user)
+    now = timezone.now()
+
+    WikiAttachment.objects.create(page=page, filename="live-1.txt")
+    WikiAttachment.objects.create(page=page, filename="live-2.txt")
+    WikiAttachment.objects.create(page=page, filename="gone.txt", deleted_at=now)
+    WikiLink.objects.create(page=page, entity_type="customer", entity_id=1)
+    WikiLink.objects.create(page=page, entity_type="customer", entity_id=2, deleted_at=now)
+    WikiLink.objects.create(page=page, entity_type="site", entity_id=3, deleted_at=now)
+
+    listed = client.get("/api/wiki-pages/", {"page_size": 200})
+    assert listed.status_code == 200, listed.data
+    rows = {row["id"]: row for row in listed.data["results"]}
+    assert rows[page.id]["attachment_count"] == 2
+    assert rows[page.id]["link_count"] == 1
+    assert rows[empty_page.id]["attachment_count"] == 0
+    assert rows[empty_page.id]["link_count"] == 0
+
+    detail = client.get(f"/api/wiki-pages/{page.id}/")
+    assert detail.status_code == 200, detail.data
+    assert detail.data["attachment_count"] == 2
+    assert detail.data["link_count"] == 1
+
+
+def test_page_list_omits_heavy_fields_and_retrieve_keeps_them():
+    user = _make_superuser()
+    page = _make_page(user)
+    client = _auth_client(user)
+    heavy = {"content_markdown", "custom_fields", "pdf_options"}
+
+    listed = client.get("/api/wiki-pages/", {"page_size": 200})
+    assert listed.status_code == 200, listed.data
+    row = next(item for item in listed.data["results"] if item["id"] == page.id)
+    assert heavy.isdisjoint(row)
+    assert row["pdf_template_key"] == page.pdf_template_key
+    assert "category_name" in row
+    assert row["created_by_username"] == user.username
+
+    detail = client.get(f"/api/wiki-pages/{page.id}/")
+    assert detail.status_code == 200, detail.data
+    assert heavy | {"pdf_template_key", "category_name", "created_by_username"} <= set(detail.data)
+    assert detail.data["content_markdown"] == page.content_markdown
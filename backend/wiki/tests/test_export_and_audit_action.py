@@ -78,10 +78,11 @@ class TestExportPdf:
 
         assert res.status_code == 200
         # Un PDF valido inizia sempre con %PDF-
-        assert res.content[:5] == b"%PDF-", (
+        pdf = res.getvalue()
+        assert pdf[:5] == b"%PDF-", (
             "Il contenuto restituito non è un PDF valido (manca l'header %PDF-)."
         )
-        assert len(res.content) > 100, "Il PDF è troppo corto per essere valido."
+        assert len(pdf) > 100, "Il PDF è troppo corto per essere valido."
 
     def test_pdf_with_empty_content_does_not_crash(self):
         user = _superuser()
@@ -91,7 +92,7 @@ class TestExportPdf:
         res = client.get(f"/api/wiki-pages/{page.id}/export-pdf/")
 
         assert res.status_code == 200
-        assert res.content[:5] == b"%PDF-"
+        assert res.getvalue()[:5] == b"%PDF-"
 
     def test_pdf_with_long_content_produces_valid_pdf(self):
         """Verifica che contenuto lungo (multi-pagina) non causi overflow o crash."""
@@ -107,7 +108,7 @@ class TestExportPdf:
         res = client.get(f"/api/wiki-pages/{page.id}/export-pdf/")
 
         assert res.status_code == 200
-        assert res.content[:5] == b"%PDF-"
+        assert res.getvalue()[:5] == b"%PDF-"
 
     def test_pdf_filename_uses_page_slug(self):
         user = _superuser()
@@ -125,6 +126,30 @@ class TestExportPdf:
         assert res.status_code == 200
         assert "documento-speciale.pdf" in res["Content-Disposition"]
 
+    def test_pdf_truncates_oversized_content(self, monkeypatch):
+        import wiki.api.pages as pages_api
+
+        monkeypatch.setattr(pages_api, "_WIKI_PDF_MAX_CHARS", 50)
+        user = _superuser()
+        page = _make_page(user, content="Testo lungo. " * 100)
+        client = _auth_client(user)
+
+        res = client.get(f"/api/wiki-pages/{page.id}/export-pdf/")
+
+        assert res.status_code == 200
+        assert res["X-Content-Truncated"] == "1"
+        assert res.getvalue()[:5] == b"%PDF-"
+
+    def test_pdf_not_truncated_has_no_header(self):
+        user = _superuser()
+        page = _make_page(user)
+        client = _auth_client(user)
+
+        res = client.get(f"/api/wiki-pages/{page.id}/export-pdf/")
+
+        assert res.status_code == 200
+        assert not res.has_header("X-Content-Truncated")
+
     def test_pdf_returns_404_for_nonexistent_page(self):
         user = _superuser()
         client = _auth_client(user)
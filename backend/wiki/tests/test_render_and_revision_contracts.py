@@ -34,6 +34,39 @@ class TestWikiRenderAndRevisionContracts:
         assert 'javascript:alert' not in payload['html'].lower()
         assert '<strong>safe</strong>' in payload['html']
 
+    def test_render_endpoint_honors_if_none_match(self, api_client, superuser, wiki_page):
+        api_client.force_authenticate(user=superuser)
+
+        first = api_client.get(f'/api/wiki-pages/{wiki_page.id}/render/')
+        assert first.status_code == 200
+        etag = first['ETag']
+
+        cached = api_client.get(f'/api/wiki-pages/{wiki_page.id}/render/', HTTP_IF_NONE_MATCH=etag)
+        assert cached.status_code == 304
+
+        api_client.patch(f'/api/wiki-pages/{wiki_page.id}/', {'content_markdown': 'New content'}, format='json')
+        changed = api_client.get(f'/api/wiki-pages/{wiki_page.id}/render/', HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == 200
+        assert 'New content' in changed.json()['html']
+
+    def test_render_version_bump_invalidates_page_and_revision_etags(self, api_client, superuser, wiki_page, monkeypatch):
+        from wiki.api import helpers
+
+        api_client.force_authenticate(user=superuser)
+        api_client.patch(f'/api/wiki-pages/{wiki_page.id}/', {'content_markdown': 'New content'}, format='json')
+        revision = WikiPageRevision.objects.get(page=wiki_page, revision_number=1)
+        urls = [f'/api/wiki-pages/{wiki_page.id}/render/', f'/api/wiki-revisions/{revision.id}/render/']
+        etags = [api_client.get(url)['ETag'] for url in urls]
+        for etag in etags:
+            assert etag.startswith(f'"{helpers._RENDER_VERSION}-')
+
+        monkeypatch.setattr(helpers, '_RENDER_VERSION', 'v-next')
+
+        for url, etag in zip(urls, etags):
+            res = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert res.status_code == 200
+            assert res['ETag'] != etag
+
     def test_updating_page_creates_revision_and_restore_reverts_content(self, api_client, superuser, wiki_page):
         api_client.force_authenticate(user=superuser)
 